@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Protocol
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.data_version_service import get_data_version
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Storage for serialized responses; keys already embed the data version."""
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+
+class LRUCache:
+    """In-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class RedisCache:
+    """Shared cache for multi-worker deployments (needs the ``redis`` package)."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(f"career-crawler:{key}")
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(f"career-crawler:{key}", value, px=int(ttl * 1000))
+
+
+class TieredCache:
+    """Look in the local LRU first, then in the optional shared backend."""
+
+    def __init__(self, local: CacheBackend, shared: CacheBackend | None = None):
+        self.local = local
+        self.shared = shared
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.local.get(key)
+        if value is None and self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                await self.local.set(key, value, settings.CACHE_TTL)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.local.set(key, value, ttl)
+        if self.shared is not None:
+            await self.shared.set(key, value, ttl)
+
+
+class DataVersionTracker:
+    """Keeps the current ``data_version`` in memory.
+
+    Updates arrive through ``LISTEN data_version``; if the listener
+    connection is unavailable the version is re-read from the database at
+    most every ``CACHE_VERSION_POLL_SECONDS``.
+    """
+
+    CHANNEL = "data_version"
+
+    def __init__(self):
+        self.value = 0
+        self._read_at = 0.0
+        self._listener = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def listening(self) -> bool:
+        return self._listener is not None and not self._listener.is_closed()
+
+    async def start(self) -> None:
+        await self._read()
+        try:
+            import asyncpg
+
+            dsn = settings.ASYNC_DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+            self._listener = await asyncpg.connect(dsn)
+            await self._listener.add_listener(self.CHANNEL, self._on_notify)
+        except Exception as exc:
+            self._listener = None
+            logger.warning("LISTEN %s unavailable, polling instead: %s", self.CHANNEL, exc)
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            self.value = max(self.value, int(payload))
+        except ValueError:
+            self._read_at = 0.0
+
+    async def _read(self) -> None:
+        async with AsyncSessionLocal() as db:
+            self.value = await get_data_version(db)
+        self._read_at = time.monotonic()
+
+    async def current(self) -> int:
+        if self.listening:
+            return self.value
+        if time.monotonic() - self._read_at >= settings.CACHE_VERSION_POLL_SECONDS:
+            async with self._lock:
+                if time.monotonic() - self._read_at >= settings.CACHE_VERSION_POLL_SECONDS:
+                    await self._read()
+        return self.value
+
+
+def _build_cache() -> TieredCache:
+    shared = None
+    if settings.CACHE_BACKEND_URL:
+        try:
+            shared = RedisCache(settings.CACHE_BACKEND_URL)
+        except ImportError:
+            logger.warning("CACHE_BACKEND_URL is set but redis is not installed; using the local cache only")
+    return TieredCache(LRUCache(settings.CACHE_MAX_ENTRIES), shared)
+
+
+response_cache = _build_cache()
+data_version = DataVersionTracker()
+
+
+# Filters matched with ILIKE / pg_trgm, where case never changes the result.
+_CASE_INSENSITIVE_PARAMS = frozenset({"search", "location"})
+
+
+def cache_key(namespace: str, **params) -> str:
+    """Stable key from the non-empty query parameters."""
+    normalized = []
+    for name in sorted(params):
+        value = params[name]
+        if value is None or value == "":
+            continue
+        if name in _CASE_INSENSITIVE_PARAMS:
+            value = str(value).lower()
+        normalized.append(f"{name}={value}")
+    return f"{namespace}?{'&'.join(normalized)}"
+
+
+async def cached_json(
+    request: Request,
+    key: str,
+    produce: Callable[[], Awaitable[bytes]],
+) -> Response:
+    """Serve ``produce()`` through the response cache with ETag revalidation.
+
+    The ETag only depends on the data version and the key, so a matching
+    ``If-None-Match`` is answered with 304 before touching the cache, the
+    database or the serializer.
+    """
+    version = await data_version.current()
+    versioned_key = f"v{version}:{key}"
+    etag = '"' + hashlib.blake2b(versioned_key.encode(), digest_size=12).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    body = await response_cache.get(versioned_key) if settings.CACHE_ENABLED else None
+    if body is None:
+        body = await produce()
+        if settings.CACHE_ENABLED:
+            await response_cache.set(versioned_key, body, settings.CACHE_TTL)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,294 @@
+"""Per-route latency, SQL statement counts and on-demand request profiling.
+
+``MetricsMiddleware`` times every HTTP request and files it under the
+matched route template (``/jobs/{job_id}``, not the raw path), so the
+number of series stays bounded.  SQL statements are counted through
+SQLAlchemy cursor events on the request engine: each request carries a
+``RequestStats`` in a context variable, which SQLAlchemy's greenlets
+inherit, so statements are attributed to the request that issued them.
+
+Requests slower than ``SLOW_REQUEST_MS`` are logged together with their
+statements and parameters.  With ``PROFILING_ENABLED`` a request sent with
+``X-Profile: 1`` (or ``cprofile`` / ``pyinstrument``) is profiled, subject
+to ``PROFILE_SAMPLE_RATE``, and the report is saved under ``PROFILE_DIR``;
+its file name comes back in the ``X-Profile-File`` response header.
+
+Metrics live in process memory: with several uvicorn workers each one
+serves its own ``/metrics``.
+"""
+
+import bisect
+import cProfile
+import logging
+import os
+import random
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+# Statements kept per request for the slow-request log.
+MAX_LOGGED_STATEMENTS = 50
+MAX_LOGGED_PARAMS = 200
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    sql_seconds: float = 0.0
+    queries: list[tuple[float, str, str]] = field(default_factory=list)
+
+
+@dataclass
+class RouteMetrics:
+    latency: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS))
+    statements: Histogram = field(default_factory=lambda: Histogram(STATEMENT_BUCKETS))
+    sql_seconds: float = 0.0
+    responses: dict[int, int] = field(default_factory=dict)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+        self.statements_total = 0
+        self.sql_seconds_total = 0.0
+        self.slow_requests = 0
+        self.profiles = 0
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.latency.observe(seconds)
+        metrics.statements.observe(stats.statements)
+        metrics.sql_seconds += stats.sql_seconds
+        metrics.responses[status] = metrics.responses.get(status, 0) + 1
+
+    def observe_statement(self, seconds: float) -> None:
+        self.statements_total += 1
+        self.sql_seconds_total += seconds
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = [
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        routes = sorted(self.routes.items())
+        for (method, route), metrics in routes:
+            lines += metrics.latency.samples("http_request_duration_seconds", _labels(method, route))
+        lines.append("# TYPE http_request_sql_statements histogram")
+        for (method, route), metrics in routes:
+            lines += metrics.statements.samples("http_request_sql_statements", _labels(method, route))
+        lines.append("# TYPE http_request_sql_seconds_total counter")
+        for (method, route), metrics in routes:
+            lines.append(f"http_request_sql_seconds_total{{{_labels(method, route)}}} {metrics.sql_seconds}")
+        lines.append("# TYPE http_responses_total counter")
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.responses.items()):
+                lines.append(f'http_responses_total{{{_labels(method, route)},status="{status}"}} {count}')
+        lines += [
+            "# TYPE sql_statements_total counter",
+            f"sql_statements_total {self.statements_total}",
+            "# TYPE sql_seconds_total counter",
+            f"sql_seconds_total {self.sql_seconds_total}",
+            "# TYPE http_slow_requests_total counter",
+            f"http_slow_requests_total {self.slow_requests}",
+            "# TYPE http_profiled_requests_total counter",
+            f"http_profiled_requests_total {self.profiles}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method: str, route: str) -> str:
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{route}"'
+
+
+registry = MetricsRegistry()
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time the statements of ``engine``; pass ``async_engine.sync_engine``."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["metrics_started"].pop()
+        registry.observe_statement(seconds)
+        stats = _request_stats.get()
+        if stats is None:
+            return
+        stats.statements += 1
+        stats.sql_seconds += seconds
+        if len(stats.queries) < MAX_LOGGED_STATEMENTS:
+            stats.queries.append((seconds, statement, repr(parameters)[:MAX_LOGGED_PARAMS]))
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("metrics_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, SQL use and optional profiles."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+        profiler = _start_profiler(scope)
+        profile_file = _profile_path(scope, profiler) if profiler is not None else None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile_file is not None:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-profile-file", os.path.basename(profile_file).encode()),
+                    ]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - started
+            _request_stats.reset(token)
+            if profiler is not None:
+                _save_profile(profiler, profile_file)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            registry.observe_request(scope["method"], route_path, status, seconds, stats)
+            if seconds * 1000 >= settings.SLOW_REQUEST_MS:
+                _log_slow_request(scope, status, seconds, stats)
+
+
+def _log_slow_request(scope: Scope, status: int, seconds: float, stats: RequestStats) -> None:
+    registry.slow_requests += 1
+    path = scope["path"] + (f"?{scope['query_string'].decode('latin-1')}" if scope.get("query_string") else "")
+    lines = [
+        f"Slow request {scope['method']} {path} -> {status}: {seconds * 1000:.1f} ms, "
+        f"{stats.statements} SQL statements in {stats.sql_seconds * 1000:.1f} ms"
+    ]
+    for query_seconds, statement, params in stats.queries:
+        lines.append(f"  {query_seconds * 1000:8.1f} ms  {' '.join(statement.split())}  params={params}")
+    if stats.statements > len(stats.queries):
+        lines.append(f"  ... {stats.statements - len(stats.queries)} more")
+    logger.warning("\n".join(lines))
+
+
+# ── profiling ────────────────────────────────────────────────────────────
+# Only one profiler can hook the interpreter at a time; overlapping
+# X-Profile requests are served unprofiled.
+_profiling = False
+
+
+def _start_profiler(scope: Scope):
+    global _profiling
+    if not settings.PROFILING_ENABLED or _profiling:
+        return None
+    requested = None
+    for name, value in scope.get("headers", ()):
+        if name == b"x-profile":
+            requested = value.decode("latin-1").strip().lower()
+            break
+    if not requested or requested in ("0", "false", "no"):
+        return None
+    if random.random() >= settings.PROFILE_SAMPLE_RATE:
+        return None
+
+    if requested != "cprofile":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            if requested == "pyinstrument":
+                logger.warning("X-Profile: pyinstrument requested but it is not installed; using cProfile")
+        else:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+            _profiling = True
+            registry.profiles += 1
+            return profiler
+
+    # cProfile sees the whole thread, so concurrent requests show up too.
+    profiler = cProfile.Profile()
+    profiler.enable()
+    _profiling = True
+    registry.profiles += 1
+    return profiler
+
+
+def _profile_path(scope: Scope, profiler) -> str:
+    slug = re.sub(r"[^a-zA-Z0-9]+", "-", scope["path"]).strip("-") or "root"
+    extension = "prof" if isinstance(profiler, cProfile.Profile) else "html"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 1_000_000:06d}-{scope['method']}-{slug}.{extension}"
+    return os.path.join(settings.PROFILE_DIR, name)
+
+
+def _save_profile(profiler, path: str) -> None:
+    global _profiling
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+    else:
+        profiler.stop()
+    _profiling = False
+    try:
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        if isinstance(profiler, cProfile.Profile):
+            profiler.dump_stats(path)
+        else:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(profiler.output_html())
+    except OSError as exc:
+        logger.warning("Could not save profile %s: %s", path, exc)
@@ -0,0 +1,75 @@
+"""Idempotent schema upgrades run at startup, after ``create_all``.
+
+The crawler (``PostgresPipeline._ensure_tables``) owns the jobs schema and
+upgrades it in place; ``Base.metadata.create_all`` only creates missing
+tables, so the pieces the API relies on are applied here as well.  Keep the
+statements in step with the crawler's.
+"""
+
+from sqlalchemy.engine import Engine
+
+# Columns and indexes the crawler added to jobs after its first release.
+# create_all never alters an existing table, and the models select these
+# columns, so an upgraded database needs them before the first request.
+JOB_COLUMNS = """
+ALTER TABLE jobs ALTER COLUMN is_active SET DEFAULT TRUE;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS source VARCHAR(255);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS canonical_key VARCHAR(32);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS simhash BIGINT;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS sources TEXT[];
+CREATE INDEX IF NOT EXISTS idx_jobs_canonical_key ON jobs(canonical_key);
+CREATE INDEX IF NOT EXISTS idx_jobs_active_source_last_seen
+    ON jobs(source, last_seen_at) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_jobs_active_last_seen_id
+    ON jobs(is_active, last_seen_at DESC, id DESC);
+
+CREATE SEQUENCE IF NOT EXISTS jobs_change_seq;
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS change_seq BIGINT
+    NOT NULL DEFAULT nextval('jobs_change_seq');
+ALTER SEQUENCE jobs_change_seq OWNED BY jobs.change_seq;
+CREATE INDEX IF NOT EXISTS idx_jobs_change_seq ON jobs(change_seq);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_title_trgm
+    ON jobs USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_jobs_location_trgm
+    ON jobs USING gin (location gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_companies_name_trgm
+    ON companies USING gin (name gin_trgm_ops);
+"""
+
+# Draws every change_seq under a shared advisory lock held until commit; see
+# job_service.get_job_changes for the reader side.
+CHANGE_SEQ_TRIGGER = """
+CREATE OR REPLACE FUNCTION jobs_assign_change_seq() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND (
+        NEW.is_active, NEW.content_hash, NEW.sources, NEW.title,
+        NEW.location, NEW.employment_type, NEW.external_id,
+        NEW.company_id, NEW.job_url
+    ) IS NOT DISTINCT FROM (
+        OLD.is_active, OLD.content_hash, OLD.sources, OLD.title,
+        OLD.location, OLD.employment_type, OLD.external_id,
+        OLD.company_id, OLD.job_url
+    ) THEN
+        NEW.change_seq := OLD.change_seq;
+        RETURN NEW;
+    END IF;
+    PERFORM pg_advisory_xact_lock_shared('jobs_change_seq'::regclass::oid::bigint);
+    NEW.change_seq := nextval('jobs_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER jobs_change_seq
+    BEFORE INSERT OR UPDATE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION jobs_assign_change_seq();
+"""
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """Bring an existing database up to what the models expect."""
+    with engine.begin() as conn:
+        # Raw driver SQL: the plpgsql body must not be parsed for bind params.
+        conn.exec_driver_sql(JOB_COLUMNS)
+        conn.exec_driver_sql(CHANGE_SEQ_TRIGGER)
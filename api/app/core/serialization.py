@@ -0,0 +1,9 @@
+import orjson
+
+# UTC datetimes as "...Z", matching how pydantic serializes the response models.
+_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dump_json(payload) -> bytes:
+    """Serialize plain dicts/lists (datetimes included) straight to JSON bytes."""
+    return orjson.dumps(payload, option=_OPTIONS)
@@ -1,14 +1,35 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 
+from app.core.cache import data_version
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import async_engine, engine, Base
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.schema import upgrade_schema
 from app.routes.company_routes import router as company_router
 from app.routes.job_routes import router as job_router
+from app.routes.metrics_routes import router as metrics_router
 
+# The trigram search indexes need pg_trgm before create_all can build them.
+with engine.begin() as conn:
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
 Base.metadata.create_all(bind=engine)
+# create_all skips existing tables; add what older databases are missing.
+upgrade_schema(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await data_version.start()
+    yield
+    await data_version.stop()
+    await async_engine.dispose()
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,10 +39,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    instrument_engine(async_engine.sync_engine)
+    # Added last so it is outermost and also times CORS handling.
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
 app.include_router(company_router)
 app.include_router(job_router)
 
 
 @app.get("/", tags=["health"])
-def health_check():
+async def health_check():
     return {"status": "ok", "project": settings.PROJECT_NAME}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -20,3 +20,6 @@ class Company(Base):
 
     def __repr__(self) -> str:
         return f"<Company id={self.id} name={self.name!r}>"
+
+
+Index("idx_companies_name_trgm", Company.name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"})
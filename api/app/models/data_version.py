@@ -0,0 +1,24 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, func
+
+from app.core.database import Base
+
+
+class DataVersion(Base):
+    """Single-row counter bumped whenever listing data changes.
+
+    The crawler bumps it (and sends ``NOTIFY data_version``) when it commits
+    a crawl; API writes bump it too.  Cached responses are keyed on it.
+    """
+
+    __tablename__ = "data_version"
+
+    SINGLETON_ID = 1
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self) -> str:
+        return f"<DataVersion version={self.version}>"
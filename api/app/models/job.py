@@ -1,8 +1,24 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, func
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
 
+# Feeds GET /jobs/changes; see PostgresPipeline for when values are assigned.
+job_change_seq = Sequence("jobs_change_seq", metadata=Base.metadata)
+
 
 class Job(Base):
     __tablename__ = "jobs"
@@ -14,11 +30,48 @@ class Job(Base):
     employment_type = Column(String(100), nullable=True)
     job_url = Column(String(1024), nullable=False, unique=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    source = Column(String(255), nullable=True)
+    # Written by the crawler; see content_fingerprint in jobcrawler.pipelines.
+    content_hash = Column(String(32), nullable=True)
+    # Cross-source dedup, see DedupPipeline: every source that listed the job.
+    canonical_key = Column(String(32), nullable=True)
+    simhash = Column(BigInteger, nullable=True)
+    sources = Column(ARRAY(String), nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
     last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    change_seq = Column(
+        BigInteger,
+        job_change_seq,
+        server_default=job_change_seq.next_value(),
+        nullable=False,
+    )
 
     company = relationship("Company", back_populates="jobs")
 
     def __repr__(self) -> str:
         return f"<Job id={self.id} title={self.title!r}>"
+
+
+# Keyset pagination walks this index in order: WHERE is_active = TRUE
+# ORDER BY last_seen_at DESC, id DESC.
+Index("idx_jobs_active_last_seen_id", Job.is_active, Job.last_seen_at.desc(), Job.id.desc())
+# Stale-job sweep run by the crawler after each crawl.
+Index(
+    "idx_jobs_active_source_last_seen",
+    Job.source,
+    Job.last_seen_at,
+    postgresql_where=text("is_active"),
+)
+# Cross-source duplicate lookups by canonical key.
+Index("idx_jobs_canonical_key", Job.canonical_key)
+# GET /jobs/changes range scans.
+Index("idx_jobs_change_seq", Job.change_seq)
+# pg_trgm indexes let leading-wildcard ILIKE searches skip the sequential scan.
+Index("idx_jobs_title_trgm", Job.title, postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"})
+Index(
+    "idx_jobs_location_trgm",
+    Job.location,
+    postgresql_using="gin",
+    postgresql_ops={"location": "gin_trgm_ops"},
+)
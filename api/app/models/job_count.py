@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, Integer
+
+from app.core.database import Base
+
+
+class JobCount(Base):
+    """Active job counters maintained by statement-level triggers on ``jobs``.
+
+    One row per company plus the ``company_id = 0`` row holding the total.
+    The triggers are installed by the crawler (``PostgresPipeline``).
+    """
+
+    __tablename__ = "job_counts"
+
+    ALL_COMPANIES = 0
+
+    company_id = Column(Integer, primary_key=True, autoincrement=False)
+    active_jobs = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<JobCount company_id={self.company_id} active_jobs={self.active_jobs}>"
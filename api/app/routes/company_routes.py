@@ -1,29 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cache_key, cached_json
 from app.core.database import get_db
 from app.schemas.company import CompanyCreate, CompanyRead
 from app.services import company_service
 
 router = APIRouter(prefix="/companies", tags=["companies"])
 
+_company_list = TypeAdapter(list[CompanyRead])
+
 
 @router.get("", response_model=list[CompanyRead])
-def list_companies(db: Session = Depends(get_db)):
-    return company_service.get_companies(db)
+async def list_companies(request: Request, db: AsyncSession = Depends(get_db)):
+    async def produce() -> bytes:
+        companies = await company_service.get_companies(db)
+        return _company_list.dump_json(_company_list.validate_python(companies, from_attributes=True))
+
+    return await cached_json(request, cache_key("companies"), produce)
 
 
 @router.get("/{company_id}", response_model=CompanyRead)
-def read_company(company_id: int, db: Session = Depends(get_db)):
-    company = company_service.get_company_by_id(db, company_id)
+async def read_company(company_id: int, db: AsyncSession = Depends(get_db)):
+    company = await company_service.get_company_by_id(db, company_id)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     return company
 
 
 @router.post("", response_model=CompanyRead, status_code=201)
-def create_company(payload: CompanyCreate, db: Session = Depends(get_db)):
-    existing = company_service.get_company_by_name(db, payload.name)
+async def create_company(payload: CompanyCreate, db: AsyncSession = Depends(get_db)):
+    existing = await company_service.get_company_by_name(db, payload.name)
     if existing:
         raise HTTPException(status_code=409, detail="Company already exists")
-    return company_service.create_company(db, payload)
+    return await company_service.create_company(db, payload)
@@ -1,33 +1,147 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, Literal
 
-from app.core.database import get_db
-from app.schemas.job import JobCreate, JobRead, PaginatedJobs
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_key, cached_json
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.serialization import dump_json
+from app.schemas.job import CountStrategy, JobChanges, JobCreate, JobRead, PaginatedJobs
 from app.services import job_service
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
 @router.get("", response_model=PaginatedJobs)
-def list_jobs(
+async def list_jobs(
+    request: Request,
     search: str | None = Query(None, description="Search keyword for title or location"),
     location: str | None = Query(None, description="Filter by location"),
     company_id: int | None = Query(None, description="Filter by company ID"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None, description="Opaque next_cursor from a previous page; takes precedence over page"),
+    count: CountStrategy | None = Query(None, description="How to compute total: exact, estimated or cached"),
+    db: AsyncSession = Depends(get_db),
+):
+    params = dict(
+        search=search,
+        location=location,
+        company_id=company_id,
+        page=page,
+        size=size,
+        cursor=cursor,
+        count=count,
+    )
+
+    async def produce() -> bytes:
+        return dump_json(await job_service.get_jobs(db, **params))
+
+    try:
+        return await cached_json(request, cache_key("jobs", **params), produce)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/changes", response_model=JobChanges)
+async def list_job_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="next_since from the previous call; 0 for a full sync"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum changes to return"),
+    db: AsyncSession = Depends(get_db),
+):
+    async def produce() -> bytes:
+        return dump_json(await job_service.get_job_changes(db, since=since, limit=limit))
+
+    return await cached_json(request, cache_key("job-changes", since=since, limit=limit), produce)
+
+
+EXPORT_CSV_COLUMNS = (
+    "id",
+    "title",
+    "location",
+    "employment_type",
+    "job_url",
+    "external_id",
+    "source",
+    "first_seen_at",
+    "last_seen_at",
+    "company_id",
+    "company_name",
+    "company_career_page_url",
+)
+
+
+async def _export_ndjson(**filters) -> AsyncIterator[bytes]:
+    # The stream outlives the request handler, so it owns its session
+    # rather than borrowing the one from get_db.
+    async with AsyncSessionLocal() as db:
+        async for batch in job_service.stream_jobs(db, **filters):
+            yield b"".join(dump_json(job) + b"\n" for job in batch)
+
+
+def _csv_value(value):
+    # ISO-8601 with a "Z" for UTC, like dump_json writes the JSON endpoints'.
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    return value
+
+
+async def _export_csv(**filters) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    async with AsyncSessionLocal() as db:
+        async for batch in job_service.stream_jobs(db, **filters):
+            for job in batch:
+                company = job["company"]
+                writer.writerow(
+                    [_csv_value(job[column]) for column in EXPORT_CSV_COLUMNS[:-2]]
+                    + [company["name"], company["career_page_url"]]
+                )
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+@router.get("/export")
+async def export_jobs(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson or csv"),
+    search: str | None = Query(None, description="Search keyword for title or location"),
+    location: str | None = Query(None, description="Filter by location"),
+    company_id: int | None = Query(None, description="Filter by company ID"),
 ):
-    return job_service.get_jobs(db, search=search, location=location, company_id=company_id, page=page, size=size)
+    """Stream every active job (with its company) matching the filters."""
+    filters = dict(search=search, location=location, company_id=company_id)
+    if fmt == "csv":
+        body, media_type = _export_csv(**filters), "text/csv"
+    else:
+        body, media_type = _export_ndjson(**filters), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="jobs.{fmt}"'},
+    )
 
 
 @router.get("/{job_id}", response_model=JobRead)
-def read_job(job_id: int, db: Session = Depends(get_db)):
-    job = job_service.get_job_by_id(db, job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-    return job
+async def read_job(request: Request, job_id: int, db: AsyncSession = Depends(get_db)):
+    async def produce() -> bytes:
+        job = await job_service.get_job_by_id(db, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return dump_json(job)
+
+    return await cached_json(request, cache_key("job", id=job_id), produce)
 
 
 @router.post("", response_model=JobRead, status_code=201)
-def create_job(payload: JobCreate, db: Session = Depends(get_db)):
-    return job_service.create_job(db, payload)
+async def create_job(payload: JobCreate, db: AsyncSession = Depends(get_db)):
+    return await job_service.create_job(db, payload)
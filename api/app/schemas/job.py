@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from app.schemas.company import CompanyRead
 
@@ -20,17 +20,33 @@ class JobCreate(JobBase):
 class JobRead(JobBase):
     id: int
     company_id: int
+    source: Optional[str] = None
+    sources: Optional[list[str]] = None
     is_active: bool
     first_seen_at: datetime
     last_seen_at: datetime
+    change_seq: int
     company: CompanyRead
 
     model_config = {"from_attributes": True}
 
 
+CountStrategy = Literal["exact", "estimated", "cached"]
+
+
 class PaginatedJobs(BaseModel):
     items: list[JobRead]
     total: int
+    # "counter" totals come from the trigger-maintained job_counts table.
+    total_kind: Literal["exact", "estimated", "cached", "counter"] = "exact"
     page: int
     size: int
     pages: int
+    next_cursor: Optional[str] = None
+
+
+class JobChanges(BaseModel):
+    # Jobs created, updated or deactivated after ``since``, oldest change first.
+    items: list[JobRead]
+    next_since: int
+    has_more: bool
@@ -1,24 +1,29 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.company import Company
 from app.schemas.company import CompanyCreate
+from app.services.data_version_service import bump_data_version
 
 
-def get_companies(db: Session) -> list[Company]:
-    return db.query(Company).order_by(Company.name).all()
+async def get_companies(db: AsyncSession) -> list[Company]:
+    result = await db.scalars(select(Company).order_by(Company.name))
+    return list(result.all())
 
 
-def get_company_by_id(db: Session, company_id: int) -> Company | None:
-    return db.query(Company).filter(Company.id == company_id).first()
+async def get_company_by_id(db: AsyncSession, company_id: int) -> Company | None:
+    return await db.get(Company, company_id)
 
 
-def get_company_by_name(db: Session, name: str) -> Company | None:
-    return db.query(Company).filter(Company.name == name).first()
+async def get_company_by_name(db: AsyncSession, name: str) -> Company | None:
+    return await db.scalar(select(Company).where(Company.name == name))
 
 
-def create_company(db: Session, payload: CompanyCreate) -> Company:
+async def create_company(db: AsyncSession, payload: CompanyCreate) -> Company:
     company = Company(**payload.model_dump())
     db.add(company)
-    db.commit()
-    db.refresh(company)
+    await db.flush()
+    await bump_data_version(db)
+    await db.commit()
+    await db.refresh(company)
     return company
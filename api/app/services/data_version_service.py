@@ -0,0 +1,31 @@
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.data_version import DataVersion
+
+
+async def get_data_version(db: AsyncSession) -> int:
+    version = await db.scalar(
+        select(DataVersion.version).where(DataVersion.id == DataVersion.SINGLETON_ID)
+    )
+    return version or 0
+
+
+async def bump_data_version(db: AsyncSession) -> int:
+    """Increment the version inside the caller's transaction.
+
+    The NOTIFY is only delivered to listeners once that transaction commits.
+    """
+    version = await db.scalar(
+        text(
+            """
+            INSERT INTO data_version (id, version) VALUES (:id, 1)
+            ON CONFLICT (id) DO UPDATE
+                SET version = data_version.version + 1, updated_at = NOW()
+            RETURNING version
+            """
+        ),
+        {"id": DataVersion.SINGLETON_ID},
+    )
+    await db.execute(text("SELECT pg_notify('data_version', :version)"), {"version": str(version)})
+    return version
@@ -1,64 +1,315 @@
+import base64
+import json
 import math
+import time
+from datetime import datetime
+from typing import AsyncIterator
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Select, any_, func, literal, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.models.company import Company
 from app.models.job import Job
-from app.schemas.job import JobCreate, PaginatedJobs
+from app.models.job_count import JobCount
+from app.schemas.job import CountStrategy, JobCreate
+from app.services.data_version_service import bump_data_version
 
+# Normalized filter tuple -> (expires_at, total) for the "cached" strategy.
+_count_cache: dict[tuple, tuple[float, int]] = {}
+_COUNT_CACHE_MAX_ENTRIES = 1024
 
-def get_jobs(
-    db: Session,
+# The jobs_change_seq trigger (see PostgresPipeline._ensure_change_seq_trigger)
+# draws every change_seq under a shared advisory lock held until commit.
+# Taking the lock exclusively waits out every writer that may still commit a
+# seq, so the sequence value read under it is a watermark below which no
+# change can appear later.
+_CHANGE_SEQ_LOCK = text("SELECT pg_advisory_xact_lock('jobs_change_seq'::regclass::oid::bigint)")
+_CHANGE_SEQ_LAST = text(
+    "SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM jobs_change_seq"
+)
+
+# Listing reads select these columns as plain rows (no ORM identity map) and
+# build JobRead/CompanyRead-shaped dicts directly; the field order matches
+# the schemas so the JSON output is unchanged.
+_JOB_FIELDS = (
+    "title",
+    "location",
+    "employment_type",
+    "job_url",
+    "external_id",
+    "id",
+    "company_id",
+    "source",
+    "sources",
+    "is_active",
+    "first_seen_at",
+    "last_seen_at",
+    "change_seq",
+)
+_COMPANY_FIELDS = ("name", "career_page_url", "logo_url", "id", "created_at", "updated_at")
+_READ_COLUMNS = tuple(getattr(Job, name) for name in _JOB_FIELDS) + tuple(
+    getattr(Company, name) for name in _COMPANY_FIELDS
+)
+_SPLIT = len(_JOB_FIELDS)
+
+
+def _job_row_to_dict(row) -> dict:
+    job = dict(zip(_JOB_FIELDS, row[:_SPLIT]))
+    job["company"] = dict(zip(_COMPANY_FIELDS, row[_SPLIT:]))
+    return job
+
+
+def _select_job_rows() -> Select:
+    return select(*_READ_COLUMNS).join(Company, Company.id == Job.company_id)
+
+
+def encode_cursor(last_seen_at: datetime, job_id: int) -> str:
+    payload = json.dumps([last_seen_at.isoformat(), job_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on bad input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_seen_at, job_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(last_seen_at), int(job_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+async def _estimate_count(db: AsyncSession, stmt: Select) -> int:
+    """Row estimate from the planner, without executing the query."""
+    compiled = stmt.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    conn = await db.connection()
+    plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _exact_count(db: AsyncSession, conditions: list) -> int:
+    return await db.scalar(select(func.count(Job.id)).where(*conditions))
+
+
+async def _cached_count(db: AsyncSession, conditions: list, key: tuple) -> int:
+    now = time.monotonic()
+    hit = _count_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    total = await _exact_count(db, conditions)
+    if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.clear()
+    _count_cache[key] = (now + settings.JOB_COUNT_CACHE_TTL, total)
+    return total
+
+
+async def _count_jobs(
+    db: AsyncSession,
+    conditions: list,
+    strategy: CountStrategy,
+    search: str | None,
+    location: str | None,
+    company_id: int | None,
+) -> tuple[int, str]:
+    if not search and not location:
+        counter = await db.get(JobCount, company_id or JobCount.ALL_COMPANIES)
+        if counter is not None:
+            return counter.active_jobs, "counter"
+
+    if strategy == "estimated":
+        return await _estimate_count(db, select(Job.id).where(*conditions)), "estimated"
+    if strategy == "cached":
+        key = (
+            (search or "").strip().lower(),
+            (location or "").strip().lower(),
+            company_id or 0,
+        )
+        return await _cached_count(db, conditions, key), "cached"
+    return await _exact_count(db, conditions), "exact"
+
+
+def _search_filter(search: str):
+    pattern = f"%{search}%"
+    if settings.SEARCH_BACKEND != "trigram":
+        return or_(Job.title.ilike(pattern), Job.location.ilike(pattern))
+
+    # Matching company ids are expanded into an array so the planner can
+    # combine all three trigram index scans with a BitmapOr on jobs.
+    matching_companies = func.array(
+        select(Company.id).where(Company.name.ilike(pattern)).scalar_subquery()
+    )
+    return or_(
+        Job.title.ilike(pattern),
+        Job.location.ilike(pattern),
+        Job.company_id == any_(matching_companies),
+    )
+
+
+def _search_rank(search: str):
+    term = literal(search)
+    return func.greatest(
+        func.word_similarity(term, Job.title),
+        func.word_similarity(term, Company.name) * 0.8,
+        func.word_similarity(term, func.coalesce(Job.location, "")) * 0.5,
+    )
+
+
+def _job_filters(
+    search: str | None,
+    location: str | None,
+    company_id: int | None,
+) -> list:
+    conditions = [Job.is_active == True]
+    if search:
+        conditions.append(_search_filter(search))
+    if location:
+        conditions.append(Job.location.ilike(f"%{location}%"))
+    if company_id:
+        conditions.append(Job.company_id == company_id)
+    return conditions
+
+
+async def get_jobs(
+    db: AsyncSession,
     search: str | None = None,
     location: str | None = None,
     company_id: int | None = None,
     page: int = 1,
     size: int = 20,
-) -> PaginatedJobs:
-    query = db.query(Job).options(joinedload(Job.company)).filter(Job.is_active == True)
+    cursor: str | None = None,
+    count: CountStrategy | None = None,
+) -> dict:
+    """Return one page of active jobs, newest first, shaped like ``PaginatedJobs``.
 
-    if search:
-        pattern = f"%{search}%"
-        query = query.filter(
-            or_(
-                Job.title.ilike(pattern),
-                Job.location.ilike(pattern),
-            )
-        )
+    Pages are addressed either by ``page`` (OFFSET) or by ``cursor``, the
+    opaque ``next_cursor`` of the previous response.  Cursor pages seek on
+    ``(last_seen_at, id)`` through ``idx_jobs_active_last_seen_id``, so
+    every page costs the same no matter how deep it is.
 
-    if location:
-        query = query.filter(Job.location.ilike(f"%{location}%"))
+    ``count`` picks how ``total`` is computed (default
+    ``JOB_COUNT_STRATEGY``); unfiltered and company-only listings always
+    read the ``job_counts`` counter table instead of scanning.
 
-    if company_id:
-        query = query.filter(Job.company_id == company_id)
+    With the ``trigram`` search backend, ``search`` also matches company
+    names and results are ranked by similarity; ranked pages are addressed
+    by ``page`` only.
 
-    total = query.count()
-    pages = math.ceil(total / size) if size else 1
-    offset = (page - 1) * size
+    The result is plain data ready for a JSON encoder; it is deliberately
+    not validated through ``PaginatedJobs`` again.
+    """
+    ranked = bool(search) and settings.SEARCH_BACKEND == "trigram"
+    if ranked and cursor:
+        raise ValueError("cursor pagination is not available for ranked search")
 
-    items = query.order_by(Job.last_seen_at.desc()).offset(offset).limit(size).all()
+    conditions = _job_filters(search, location, company_id)
 
-    return PaginatedJobs(
-        items=items,
-        total=total,
-        page=page,
-        size=size,
-        pages=pages,
+    total, total_kind = await _count_jobs(
+        db, conditions, count or settings.JOB_COUNT_STRATEGY, search, location, company_id
     )
+    pages = math.ceil(total / size) if size else 1
 
+    stmt = _select_job_rows()
+    if ranked:
+        stmt = (
+            stmt.where(*conditions)
+            .order_by(_search_rank(search).desc(), Job.last_seen_at.desc(), Job.id.desc())
+            .offset((page - 1) * size)
+        )
+    elif cursor:
+        last_seen_at, last_id = decode_cursor(cursor)
+        stmt = (
+            stmt.where(*conditions, tuple_(Job.last_seen_at, Job.id) < tuple_(last_seen_at, last_id))
+            .order_by(Job.last_seen_at.desc(), Job.id.desc())
+        )
+    else:
+        stmt = (
+            stmt.where(*conditions)
+            .order_by(Job.last_seen_at.desc(), Job.id.desc())
+            .offset((page - 1) * size)
+        )
 
-def get_job_by_id(db: Session, job_id: int) -> Job | None:
-    return (
-        db.query(Job)
-        .options(joinedload(Job.company))
-        .filter(Job.id == job_id)
-        .first()
+    # One extra row tells us whether another page exists without a second query.
+    rows = (await db.execute(stmt.limit(size + 1))).all()
+    items = [_job_row_to_dict(row) for row in rows[:size]]
+    next_cursor = None
+    if len(rows) > size and not ranked:
+        next_cursor = encode_cursor(items[-1]["last_seen_at"], items[-1]["id"])
+
+    return {
+        "items": items,
+        "total": total,
+        "total_kind": total_kind,
+        "page": page,
+        "size": size,
+        "pages": pages,
+        "next_cursor": next_cursor,
+    }
+
+
+async def stream_jobs(
+    db: AsyncSession,
+    search: str | None = None,
+    location: str | None = None,
+    company_id: int | None = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[list[dict]]:
+    """Yield every active job matching the ``get_jobs`` filters, in id order.
+
+    Rows come from a server-side cursor ``batch_size`` at a time, so memory
+    stays flat however many rows match.
+    """
+    stmt = _select_job_rows().where(*_job_filters(search, location, company_id)).order_by(Job.id)
+    result = await db.stream(stmt, execution_options={"yield_per": batch_size})
+    async for partition in result.partitions():
+        yield [_job_row_to_dict(row) for row in partition]
+
+
+async def get_job_changes(db: AsyncSession, since: int = 0, limit: int = 500) -> dict:
+    """Jobs whose ``change_seq`` is above ``since``, shaped like ``JobChanges``.
+
+    Inactive jobs are included so mirrors can drop them.  Clients pass the
+    returned ``next_since`` back as ``since`` until ``has_more`` is false.
+
+    Only seqs up to a watermark are returned: the last value drawn once no
+    writer still holds an uncommitted one.  The watermark is read in its
+    own transaction, so the query after it sees every change below it.
+    """
+    await db.execute(_CHANGE_SEQ_LOCK)
+    watermark = (await db.execute(_CHANGE_SEQ_LAST)).scalar_one()
+    await db.commit()
+
+    stmt = (
+        _select_job_rows()
+        .where(Job.change_seq > since, Job.change_seq <= watermark)
+        .order_by(Job.change_seq)
+        .limit(limit + 1)
     )
+    rows = (await db.execute(stmt)).all()
+    items = [_job_row_to_dict(row) for row in rows[:limit]]
+    has_more = len(rows) > limit
+    if has_more:
+        next_since = items[-1]["change_seq"]
+    else:
+        # Everything up to the watermark has been seen, gaps included.
+        next_since = max(since, watermark)
+    return {"items": items, "next_since": next_since, "has_more": has_more}
+
+
+async def get_job_by_id(db: AsyncSession, job_id: int) -> dict | None:
+    """Return one job shaped like ``JobRead``, or ``None``."""
+    row = (await db.execute(_select_job_rows().where(Job.id == job_id))).first()
+    return _job_row_to_dict(row) if row is not None else None
 
 
-def create_job(db: Session, payload: JobCreate) -> Job:
+async def create_job(db: AsyncSession, payload: JobCreate) -> Job:
     job = Job(**payload.model_dump())
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.flush()
+    await bump_data_version(db)
+    await db.commit()
+    # Relationships cannot lazy-load under asyncio, so load company up front.
+    await db.refresh(job)
+    await db.refresh(job, attribute_names=["company"])
     return job
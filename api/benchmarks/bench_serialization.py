@@ -0,0 +1,100 @@
+"""Per-request CPU cost of building a GET /jobs response body.
+
+No database is needed: the same synthetic page is pushed through
+
+* ``response_model`` — the original path: ORM ``Job``/``Company`` objects are
+  validated into ``PaginatedJobs`` (``from_attributes``), and FastAPI dumps,
+  re-validates and JSON-encodes it for the ``response_model``;
+* ``model_dump_json`` — one validation pass, then pydantic's encoder;
+* ``lean`` — column rows turned into dicts and encoded with orjson, which is
+  what ``job_service.get_jobs`` and the routes do now.
+
+::
+
+    cd api
+    python -m benchmarks.bench_serialization --size 100 --iterations 2000
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from pydantic import TypeAdapter
+
+from app.models.company import Company
+from app.models.job import Job
+from app.schemas.job import PaginatedJobs
+from app.core.serialization import dump_json
+from app.services.job_service import _job_row_to_dict
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_rows(size):
+    rows = []
+    for n in range(size):
+        seen = NOW - timedelta(minutes=n)
+        rows.append((
+            f"Senior Backend Engineer {n}", "Remote", "full_time",
+            f"https://example.com/jobs/{n}", f"example-{n}", n + 1, n % 7 + 1,
+            "Remotive", True, seen, seen,
+            f"Company {n % 7}", "https://example.com", None, n % 7 + 1, NOW, NOW,
+        ))
+    return rows
+
+
+def orm_objects(rows):
+    jobs = []
+    for r in rows:
+        company = Company(name=r[11], career_page_url=r[12], logo_url=r[13], id=r[14],
+                          created_at=r[15], updated_at=r[16])
+        jobs.append(Job(title=r[0], location=r[1], employment_type=r[2], job_url=r[3],
+                        external_id=r[4], id=r[5], company_id=r[6], source=r[7],
+                        is_active=r[8], first_seen_at=r[9], last_seen_at=r[10],
+                        company=company))
+    return jobs
+
+
+def page_args(size):
+    return {"total": 10_000, "page": 1, "size": size, "pages": 100, "next_cursor": "abc"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.size)
+    adapter = TypeAdapter(PaginatedJobs)
+
+    def response_model():
+        page = PaginatedJobs(items=orm_objects(rows), **page_args(args.size))
+        validated = adapter.validate_python(page.model_dump())
+        content = adapter.dump_python(validated, mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False,
+                          separators=(",", ":")).encode()
+
+    def model_dump_json():
+        page = PaginatedJobs(items=orm_objects(rows), **page_args(args.size))
+        return page.model_dump_json().encode()
+
+    def lean():
+        return dump_json({"items": [_job_row_to_dict(row) for row in rows],
+                          "total_kind": "exact", **page_args(args.size)})
+
+    baseline = None
+    for name, fn in (("response_model", response_model),
+                     ("model_dump_json", model_dump_json),
+                     ("lean", lean)):
+        fn()  # warm up
+        seconds = min(timeit.repeat(fn, number=args.iterations, repeat=3))
+        per_request_us = seconds / args.iterations * 1e6
+        baseline = baseline or per_request_us
+        print(f"{name:<16} {per_request_us:>9.1f} µs/request"
+              f"  ({baseline / per_request_us:4.1f}x vs response_model)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Concurrent GET /jobs load test reporting requests/sec and latency percentiles.
+
+Each ``--target`` is ``label=base_url``.  To compare the synchronous and the
+asyncio database stacks, run both builds side by side, for example the
+pre-async revision from a git worktree on port 8001 and the current tree on
+port 8000, both with the same ``--workers``::
+
+    uvicorn app.main:app --port 8000 --workers 1
+    (cd ../api-sync && uvicorn app.main:app --port 8001 --workers 1)
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.load_test \\
+        --target async=http://localhost:8000 --target sync=http://localhost:8001 \\
+        --concurrency 200 --requests 20000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+QUERIES = (
+    {},
+    {"page": 5},
+    {"page": 50, "size": 50},
+    {"search": "engineer"},
+    {"location": "remote"},
+    {"company_id": 1},
+)
+
+
+def percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(len(sorted_samples) * pct / 100))
+    return sorted_samples[index]
+
+
+async def run_target(base_url, concurrency, total, timeout):
+    latencies = []
+    errors = 0
+    remaining = total
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        await client.get("/jobs")  # warm the connection pool on both ends
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                params = random.choice(QUERIES)
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/jobs", params=params)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", action="append", required=True, metavar="LABEL=URL")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.target:
+        label, _, url = target.partition("=")
+        random.seed(args.seed)
+        results[label] = asyncio.run(run_target(url, args.concurrency, args.requests, args.timeout))
+        r = results[label]
+        print(
+            f"{label:<8} {r['requests_per_sec']:>8.1f} req/s  p50 {r['p50_ms']:>7.1f}ms"
+            f"  p95 {r['p95_ms']:>7.1f}ms  p99 {r['p99_ms']:>7.1f}ms  errors {r['errors']}",
+            flush=True,
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ export function useJobsQuery(filters: JobFilters = {}) {
       if (filters.company_id) params.company_id = filters.company_id;
       if (filters.page) params.page = filters.page;
       if (filters.size) params.size = filters.size;
+      if (filters.cursor) params.cursor = filters.cursor;
 
       const { data } = await apiClient.get<PaginatedJobs>("/jobs", { params });
       return data;
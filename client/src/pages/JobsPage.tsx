@@ -44,6 +44,8 @@ export default function JobsPage() {
 
   const { data, isLoading, isError, error } = useJobsQuery(filters);
   const { data: companies } = useCompaniesQuery();
+  // Estimated totals come from planner statistics, not a COUNT.
+  const approx = data?.total_kind === "estimated" ? "~" : "";
 
   const handleSearch = (e: React.ChangeEvent<HTMLInputElement>) =>
     setFilters((prev) => ({ ...prev, search: e.target.value || undefined, page: 1 }));
@@ -72,7 +74,7 @@ export default function JobsPage() {
         <div className="page-header__top">
           <h1 className="page-title">Job Listings</h1>
           {data && (
-            <span className="page-count">{data.total.toLocaleString()} positions</span>
+            <span className="page-count">{approx}{data.total.toLocaleString()} positions</span>
           )}
         </div>
         <p className="page-subtitle">Browse opportunities aggregated from multiple sources</p>
@@ -138,7 +140,7 @@ export default function JobsPage() {
       {data && !isLoading && (
         <div className="results-meta">
           <span className="results-meta__count">
-            Showing {data.items.length} of {data.total.toLocaleString()} jobs
+            Showing {data.items.length} of {approx}{data.total.toLocaleString()} jobs
             {filters.search ? ` for "${filters.search}"` : ""}
           </span>
           <span>Page {data.page} of {data.pages}</span>
@@ -8,9 +8,12 @@ export interface Job {
   employment_type: string | null;
   job_url: string;
   company_id: number;
+  source: string | null;
+  sources: string[] | null;
   is_active: boolean;
   first_seen_at: string;
   last_seen_at: string;
+  change_seq: number;
   company: Company;
 }
 
@@ -26,9 +29,11 @@ export interface JobCreate {
 export interface PaginatedJobs {
   items: Job[];
   total: number;
+  total_kind: "exact" | "estimated" | "cached" | "counter";
   page: number;
   size: number;
   pages: number;
+  next_cursor: string | null;
 }
 
 export interface JobFilters {
@@ -37,4 +42,5 @@ export interface JobFilters {
   company_id?: number;
   page?: number;
   size?: number;
+  cursor?: string;
 }
@@ -0,0 +1,85 @@
+"""Measure the shared JSON-source hot loop on synthetic jobs.
+
+For every JSON source in ``jobcrawler.sources`` a job object matching its
+``fields`` spec is synthesised and run through the compiled extractor and
+``CompanySpider._make_item``, the work ``parse_json_source`` does per job::
+
+    cd crawler
+    python -m benchmarks.bench_extract --jobs 200000
+"""
+
+import argparse
+import json
+import time
+
+from jobcrawler.sources import EXTRACTORS, SOURCES
+from jobcrawler.spiders.company_spider import CompanySpider
+
+
+def _paths(spec):
+    if isinstance(spec, str):
+        yield spec
+    elif isinstance(spec, list):
+        for part in spec:
+            yield from _paths(part)
+    else:
+        yield spec["path"]
+
+
+def synthetic_jobs(source, count):
+    jobs = []
+    for n in range(count):
+        job = {}
+        for name, spec in source["fields"].items():
+            for path in _paths(spec):
+                *parents, leaf = path.split(".")
+                target = job
+                for key in parents:
+                    target = target.setdefault(key, {})
+                target.setdefault(leaf, f"{name} {n}")
+        jobs.append(job)
+    return jobs
+
+
+def run(count):
+    spider = CompanySpider()
+    results = []
+    for source in SOURCES:
+        if source["name"] not in EXTRACTORS:
+            continue
+        jobs = synthetic_jobs(source, count)
+        extract = EXTRACTORS[source["name"]]
+        career_page = source["career_page_url"]
+        started = time.perf_counter()
+        items = 0
+        for job in jobs:
+            fields = extract(job)
+            if fields is None:
+                continue
+            spider._make_item(career_page_url=career_page, source=source["name"], **fields)
+            items += 1
+        elapsed = time.perf_counter() - started
+        results.append({
+            "source": source["name"],
+            "items": items,
+            "seconds": round(elapsed, 4),
+            "items_per_sec": round(items / elapsed),
+        })
+        print(f"{source['name']:>22}  {items:>9,} items  {items / elapsed:>12,.0f}/s", flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=200_000)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.jobs)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare Kalibrr listing-page extraction paths on saved fixture pages.
+
+* ``css`` — the original selector code: a CSS union, then ``::text`` /
+  join / ``re.sub`` per link.
+* ``xpath`` — ``htmlextract.link_candidates``, one pass over the anchors.
+* ``structured`` — ``htmlextract.structured_jobs`` on a page carrying
+  JSON-LD ``JobPosting`` data.
+
+Fixtures live in ``benchmarks/fixtures``.  Every page is parsed from bytes
+on each iteration, as a fresh response would be::
+
+    cd crawler
+    python -m benchmarks.bench_html --iterations 200
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+from scrapy.http import HtmlResponse
+
+from jobcrawler import htmlextract
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+PAGE_URL = "https://www.kalibrr.com/job-board/te/software-engineer/1"
+
+
+def css_path(response):
+    links = response.css("a[href*='/job/'], a[href*='job-board'], a[href*='jobs']") or response.css("a[href]")
+    seen = set()
+    jobs = 0
+    for link in links:
+        href = (link.attrib.get("href") or "").strip()
+        if not href or href.startswith("#"):
+            continue
+        job_url = response.urljoin(href)
+        if job_url in seen:
+            continue
+        seen.add(job_url)
+        title = " ".join(t.strip() for t in link.css("::text").getall() if t.strip())
+        title = re.sub(r"\s+", " ", title).strip()
+        if htmlextract.looks_like_job_title(title):
+            jobs += 1
+    return jobs
+
+
+def xpath_path(response):
+    seen = set()
+    jobs = 0
+    for href, title in htmlextract.link_candidates(response):
+        job_url = response.urljoin(href)
+        if job_url in seen:
+            continue
+        seen.add(job_url)
+        if htmlextract.looks_like_job_title(title):
+            jobs += 1
+    return jobs
+
+
+def structured_path(response):
+    return len(htmlextract.structured_jobs(response))
+
+
+CASES = (
+    ("css", "kalibrr_listing.html", css_path),
+    ("xpath", "kalibrr_listing.html", xpath_path),
+    ("structured", "kalibrr_listing_jsonld.html", structured_path),
+)
+
+
+def run(iterations):
+    results = []
+    for name, fixture, extract in CASES:
+        with open(os.path.join(FIXTURES, fixture), "rb") as fh:
+            body = fh.read()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            jobs = extract(HtmlResponse(url=PAGE_URL, body=body, encoding="utf-8"))
+        elapsed = time.perf_counter() - started
+        results.append({
+            "path": name,
+            "fixture": fixture,
+            "jobs_per_page": jobs,
+            "pages_per_sec": round(iterations / elapsed, 1),
+            "ms_per_page": round(elapsed / iterations * 1000, 3),
+        })
+        print(
+            f"{name:>10}  {jobs:>4} jobs/page  {iterations / elapsed:>8,.1f} pages/s"
+            f"  {elapsed / iterations * 1000:7.3f} ms/page",
+            flush=True,
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Compare whole-document and streaming JSON decoding of source payloads.
+
+Builds Remotive-shaped synthetic payloads of the requested sizes and decodes
+each one with every available parser, counting the jobs it yields:
+
+* ``json`` — ``json.loads(response.text)``, the spider's original path.
+* ``orjson`` — ``orjson.loads(response.body)``.
+* ``ijson`` — ``jsonstream.iter_items``, the path used above
+  ``JSON_STREAMING_THRESHOLD``.
+
+Every measurement runs in a fresh process, so the reported peak RSS is the
+growth over the raw body alone::
+
+    cd crawler
+    python -m benchmarks.bench_json --sizes-mb 1 8 32
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from jobcrawler import jsonstream
+
+PARSERS = ("json", "orjson", "ijson")
+
+
+def synthetic_payload(size_mb):
+    jobs = []
+    written = 0
+    n = 0
+    while written < size_mb * 1024 * 1024:
+        job = {
+            "id": n,
+            "url": f"https://bench.example.com/jobs/{n}",
+            "title": f"Senior Software Engineer {n % 997}",
+            "company_name": f"Bench Company {n % 300}",
+            "candidate_required_location": ("Worldwide", "Philippines", "Europe")[n % 3],
+            "job_type": "full_time",
+            "tags": ["python", "postgresql", "scrapy"],
+            "description": "<p>" + "Build and run data pipelines. " * 40 + "</p>",
+        }
+        jobs.append(job)
+        written += len(json.dumps(job)) + 1
+        n += 1
+    return json.dumps({"job-count": len(jobs), "jobs": jobs}).encode("utf-8")
+
+
+def _consume(parser, body):
+    if parser == "json":
+        jobs = json.loads(body.decode("utf-8"))["jobs"]
+    elif parser == "orjson":
+        jobs = jsonstream.orjson.loads(body)["jobs"]
+    else:
+        jobs = jsonstream.iter_items(body, "jobs")
+    count = 0
+    for job in jobs:
+        if job["title"] and job["url"]:
+            count += 1
+    return count
+
+
+def _measure(parser, path, queue):
+    with open(path, "rb") as fh:
+        body = fh.read()
+    # ru_maxrss is in KiB on Linux; the body is already resident here.
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    count = _consume(parser, body)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((count, elapsed, (peak - baseline) / 1024))
+
+
+def measure(parser, path):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(parser, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def available_parsers():
+    parsers = ["json"]
+    if jsonstream.orjson is not None:
+        parsers.append("orjson")
+    if jsonstream.can_stream():
+        parsers.append("ijson")
+    return parsers
+
+
+def run(sizes_mb, parsers):
+    results = []
+    for size_mb in sizes_mb:
+        body = synthetic_payload(size_mb)
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as fh:
+            fh.write(body)
+            path = fh.name
+        try:
+            for parser in parsers:
+                count, elapsed, peak_mb = measure(parser, path)
+                result = {
+                    "parser": parser,
+                    "size_mb": round(len(body) / 1024 / 1024, 2),
+                    "items": count,
+                    "seconds": round(elapsed, 4),
+                    "items_per_sec": round(count / elapsed),
+                    "peak_rss_growth_mb": round(peak_mb, 1),
+                }
+                results.append(result)
+                print(
+                    f"{parser:>7} {result['size_mb']:>7.1f} MB  {count:>8,} items"
+                    f"  {count / elapsed:>12,.0f}/s  peak +{peak_mb:7.1f} MB",
+                    flush=True,
+                )
+        finally:
+            os.unlink(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--parsers", nargs="+", choices=PARSERS, default=available_parsers())
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.sizes_mb, args.parsers)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Items/sec of every source's parser on saved fixture payloads.
+
+Each ``SOURCES`` entry is fed the fixture saved for its host (sources that
+extend another share its payload) through the spider callback a crawl
+would call — ``parse_json_source`` or the source's ``parser`` — with the
+request meta ``CompanySpider`` sets on a first page.  Items are counted;
+follow-up page requests are built but not fetched.
+
+The fixtures in ``benchmarks/fixtures`` are trimmed, anonymised copies of
+each board's response format.  Refresh one by saving a live response over
+it.  ``--json-threshold 0`` sends every JSON body down the ijson streaming
+path::
+
+    cd crawler
+    python -m benchmarks.bench_parsers --iterations 200
+"""
+
+import argparse
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+from scrapy.http import HtmlResponse, TextResponse
+from scrapy.utils.test import get_crawler
+
+from jobcrawler.items import JobItem
+from jobcrawler.sources import SOURCES
+from jobcrawler.spiders.company_spider import CompanySpider
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+# Host -> fixture files; every SOURCES host needs at least one.
+HOST_FIXTURES = {
+    "remotive.com": ("remotive.json",),
+    "www.arbeitnow.com": ("arbeitnow.json",),
+    "himalayas.app": ("himalayas.json",),
+    "www.kalibrr.com": ("kalibrr_listing.html", "kalibrr_listing_jsonld.html"),
+}
+
+
+def make_spider(json_threshold):
+    settings = {} if json_threshold is None else {"JSON_STREAMING_THRESHOLD": json_threshold}
+    crawler = get_crawler(CompanySpider, settings)
+    spider = CompanySpider.from_crawler(crawler)
+    for source in SOURCES:
+        spider._sources[source["name"]] = source
+    return spider
+
+
+def parse_fixture(spider, source, body):
+    """Run ``source``'s callback on ``body``; return the number of items."""
+    request = spider._page_request(source, source["url"], page=1)
+    response_cls = HtmlResponse if source.get("format") == "html" else TextResponse
+    response = response_cls(url=source["url"], body=body, encoding="utf-8", request=request)
+    return sum(1 for output in request.callback(response) if isinstance(output, JobItem))
+
+
+def run(iterations, json_threshold=None):
+    spider = make_spider(json_threshold)
+    results = []
+    for source in SOURCES:
+        host = urlsplit(source["url"]).hostname
+        fixtures = HOST_FIXTURES.get(host)
+        if not fixtures:
+            raise SystemExit(f"No fixture for {source['name']} ({host}); add one to HOST_FIXTURES")
+        for fixture in fixtures:
+            with open(os.path.join(FIXTURES, fixture), "rb") as fh:
+                body = fh.read()
+            started = time.perf_counter()
+            for _ in range(iterations):
+                items = parse_fixture(spider, source, body)
+            elapsed = time.perf_counter() - started
+            results.append({
+                "source": source["name"],
+                "fixture": fixture,
+                "items_per_page": items,
+                "items_per_sec": round(items * iterations / elapsed),
+                "ms_per_page": round(elapsed / iterations * 1000, 3),
+            })
+            print(
+                f"{source['name']:>22}  {fixture:<28} {items:>4} items/page"
+                f"  {items * iterations / elapsed:>10,.0f} items/s"
+                f"  {elapsed / iterations * 1000:7.3f} ms/page",
+                flush=True,
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--json-threshold", type=int,
+                        help="override JSON_STREAMING_THRESHOLD (bytes)")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.json_threshold)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Canonical keys and near-duplicate detection for crawled jobs.
+
+A job is identified across sources by:
+
+* its normalised URL — scheme and host lowercased, ``www.``, fragment,
+  trailing slash and tracking parameters dropped, query sorted;
+* its canonical key — a hash of the normalised title, company and location;
+* its 64-bit SimHash over title, company and location tokens, for postings
+  whose wording differs slightly between boards.
+
+``DedupIndex`` answers all three lookups from dicts.  A board may list
+distinct openings with the same title, company and location, so canonical
+key and SimHash matches only count across sources: a candidate is skipped
+when the job's source has already been seen on it.  SimHash matches use
+banding: the signature is split into ``max_distance + 1`` bands, and two
+signatures within ``max_distance`` bits must agree on at least one whole
+band, so only the jobs sharing a band are compared.
+"""
+
+import hashlib
+import re
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "mc_cid", "mc_eid", "ref", "referrer", "source", "src",
+})
+TRACKING_PREFIXES = ("utm_",)
+COMPANY_SUFFIXES = frozenset({
+    "co", "corp", "corporation", "gmbh", "inc", "incorporated", "limited",
+    "llc", "ltd", "plc", "pte", "sa", "bv",
+})
+NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+SIMHASH_BITS = 64
+
+
+def normalize_text(value):
+    text = unicodedata.normalize("NFKD", value or "")
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    return NON_ALNUM_RE.sub(" ", text).strip()
+
+
+def normalize_company(value):
+    words = normalize_text(value).split()
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def normalize_url(url):
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), host, path, urlencode(query), ""))
+
+
+def canonical_key(title, company, location):
+    """Return a 32-character hex key of the normalised title/company/location."""
+    payload = "\x1f".join(
+        (normalize_text(title), normalize_company(company), normalize_text(location))
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def simhash(title, company, location):
+    """Return the 64-bit SimHash of the job's tokens as a signed integer.
+
+    Signed so the value fits a PostgreSQL ``BIGINT`` column.
+    """
+    title_words = normalize_text(title).split()
+    features = title_words + [f"{a} {b}" for a, b in zip(title_words, title_words[1:])]
+    features += normalize_company(company).split()
+    features += normalize_text(location).split()
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        value = int.from_bytes(
+            hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    signature = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            signature |= 1 << bit
+    return signature - (1 << SIMHASH_BITS) if signature >= 1 << (SIMHASH_BITS - 1) else signature
+
+
+class DedupIndex:
+    """In-memory index from URL, canonical key and SimHash to canonical job URLs.
+
+    ``sources`` maps every canonical job URL to the sources it was seen on.
+    """
+
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = SIMHASH_BITS // bands
+        self._bands = tuple(
+            (index * width, (1 << (width if index < bands - 1 else SIMHASH_BITS - index * width)) - 1)
+            for index in range(bands)
+        )
+        self.by_url = {}
+        self.by_key = {}
+        self.by_band = {}
+        self.sources = {}
+
+    def __len__(self):
+        return len(self.sources)
+
+    def find(self, url, key, signature, company, sources=()):
+        """Return the canonical job URL matching these identifiers, or None.
+
+        A URL match is returned whatever its sources; key and SimHash
+        matches only if none of ``sources`` has been seen on the candidate.
+        """
+        canonical = self.by_url.get(url)
+        if canonical is not None:
+            return canonical
+        for job_url in self.by_key.get(key, ()):
+            if self.sources[job_url].isdisjoint(sources):
+                return job_url
+        if signature is None:
+            return None
+
+        unsigned = signature & ((1 << SIMHASH_BITS) - 1)
+        for band, (shift, mask) in enumerate(self._bands):
+            for other, other_company, job_url in self.by_band.get((band, unsigned >> shift & mask), ()):
+                if (
+                    other_company == company
+                    and self.sources[job_url].isdisjoint(sources)
+                    and bin(unsigned ^ other).count("1") <= self.max_distance
+                ):
+                    return job_url
+        return None
+
+    def add(self, url, key, signature, company, job_url, sources=()):
+        """Register ``job_url``, seen on ``sources``, as a canonical job."""
+        self.by_url.setdefault(url, job_url)
+        self.by_key.setdefault(key, []).append(job_url)
+        self.sources.setdefault(job_url, set()).update(sources)
+        if signature is None:
+            return
+        unsigned = signature & ((1 << SIMHASH_BITS) - 1)
+        entry = (unsigned, company, job_url)
+        for band, (shift, mask) in enumerate(self._bands):
+            self.by_band.setdefault((band, unsigned >> shift & mask), []).append(entry)
+
+    def alias(self, url, job_url, sources=()):
+        """Map another URL, seen on ``sources``, to an existing canonical job."""
+        self.by_url.setdefault(url, job_url)
+        self.sources[job_url].update(sources)
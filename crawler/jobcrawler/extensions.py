@@ -0,0 +1,239 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+from jobcrawler import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DomainLimits:
+    min_delay: float
+    max_delay: float
+    min_concurrency: int
+    max_concurrency: int
+
+
+@dataclass
+class DomainState:
+    latency: float = 0.0
+    error_rate: float = 0.0
+    streak: int = 0
+    backoffs: int = 0
+
+
+class AdaptiveThrottle:
+    """Tune download delay and concurrency separately for every domain.
+
+    Replaces a fixed ``DOWNLOAD_DELAY`` with an additive-increase,
+    multiplicative-decrease controller on each downloader slot.  The slot
+    starts from ``DOWNLOAD_DELAY``/``CONCURRENT_REQUESTS_PER_DOMAIN``;
+    afterwards, on every downloaded response:
+
+    * 429 or 5xx — concurrency is halved and the delay doubled (at least
+      ``ADAPTIVE_THROTTLE_BACKOFF_DELAY``), and never shorter than the
+      response's ``Retry-After``.
+    * latency above ``ADAPTIVE_THROTTLE_TARGET_LATENCY`` — the delay drifts
+      up towards the observed latency.
+    * ``ADAPTIVE_THROTTLE_INCREASE_AFTER`` fast successes in a row — one
+      more concurrent request and a 25% shorter delay.
+
+    The results are clamped to the floors and ceilings declared in the
+    ``throttle`` entry of the spider's ``SOURCES`` (``min_delay``,
+    ``max_delay``, ``min_concurrency``, ``max_concurrency``), falling back
+    to the ``ADAPTIVE_THROTTLE_*`` settings.  The current values are kept in
+    the ``throttle/<domain>/*`` stats.
+    """
+
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, crawler):
+        settings = crawler.settings
+        if not settings.getbool("ADAPTIVE_THROTTLE_ENABLED"):
+            raise NotConfigured
+        if settings.getbool("AUTOTHROTTLE_ENABLED"):
+            logger.warning("AdaptiveThrottle disabled: AUTOTHROTTLE_ENABLED is set")
+            raise NotConfigured
+
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.target_latency = settings.getfloat("ADAPTIVE_THROTTLE_TARGET_LATENCY", 1.0)
+        self.increase_after = max(1, settings.getint("ADAPTIVE_THROTTLE_INCREASE_AFTER", 10))
+        self.backoff_delay = settings.getfloat("ADAPTIVE_THROTTLE_BACKOFF_DELAY", 1.0)
+        self.max_retry_after = settings.getfloat("ADAPTIVE_THROTTLE_MAX_RETRY_AFTER", 300.0)
+        self.default_limits = DomainLimits(
+            min_delay=settings.getfloat("ADAPTIVE_THROTTLE_MIN_DELAY", 0.25),
+            max_delay=settings.getfloat("ADAPTIVE_THROTTLE_MAX_DELAY", 60.0),
+            min_concurrency=settings.getint("ADAPTIVE_THROTTLE_MIN_CONCURRENCY", 1),
+            max_concurrency=settings.getint("ADAPTIVE_THROTTLE_MAX_CONCURRENCY", 1),
+        )
+        self.limits = {}
+        self.states = {}
+
+        crawler.signals.connect(self.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(self.response_downloaded, signal=signals.response_downloaded)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def spider_opened(self, spider):
+        for source in getattr(spider, "SOURCES", []):
+            domain = urlsplit(source.get("url", "")).hostname
+            if domain:
+                self.limits[domain] = self._merge_limits(
+                    self.limits.get(domain), source.get("throttle") or {}
+                )
+
+    def _merge_limits(self, current, declared):
+        defaults = self.default_limits
+        limits = DomainLimits(
+            min_delay=float(declared.get("min_delay", defaults.min_delay)),
+            max_delay=float(declared.get("max_delay", defaults.max_delay)),
+            min_concurrency=int(declared.get("min_concurrency", defaults.min_concurrency)),
+            max_concurrency=int(declared.get("max_concurrency", defaults.max_concurrency)),
+        )
+        if current is None:
+            return limits
+        # Several sources on one domain share a slot: keep the strictest limits.
+        return DomainLimits(
+            min_delay=max(current.min_delay, limits.min_delay),
+            max_delay=max(current.max_delay, limits.max_delay),
+            min_concurrency=min(current.min_concurrency, limits.min_concurrency),
+            max_concurrency=min(current.max_concurrency, limits.max_concurrency),
+        )
+
+    def response_downloaded(self, response, request, spider):
+        key = request.meta.get("download_slot")
+        slot = self.crawler.engine.downloader.slots.get(key) if key else None
+        if slot is None:
+            return
+
+        domain = urlsplit(request.url).hostname or key
+        limits = self.limits.get(domain, self.default_limits)
+        state = self.states.setdefault(key, DomainState())
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            state.latency = _ewma(state.latency, latency, self.EWMA_ALPHA)
+
+        delay, concurrency = slot.delay, slot.concurrency
+        failed = response.status == 429 or response.status >= 500
+        state.error_rate = _ewma(state.error_rate, 1.0 if failed else 0.0, self.EWMA_ALPHA)
+        retry_after = 0.0
+
+        if failed:
+            state.streak = 0
+            state.backoffs += 1
+            concurrency = concurrency // 2
+            delay = max(delay * 2, self.backoff_delay)
+            retry_after = min(_retry_after(response), self.max_retry_after)
+        elif state.latency > self.target_latency:
+            state.streak = 0
+            delay = max(delay, (delay + state.latency) / 2)
+        else:
+            state.streak += 1
+            if state.streak >= self.increase_after:
+                state.streak = 0
+                concurrency += 1
+                delay *= 0.75
+
+        slot.delay = max(min(max(delay, limits.min_delay), limits.max_delay), retry_after)
+        slot.concurrency = min(max(concurrency, limits.min_concurrency), limits.max_concurrency)
+        self._record(key, slot, state)
+
+    def _record(self, key, slot, state):
+        prefix = f"throttle/{key}"
+        self.stats.set_value(f"{prefix}/delay", round(slot.delay, 3))
+        self.stats.set_value(f"{prefix}/concurrency", slot.concurrency)
+        self.stats.set_value(f"{prefix}/latency", round(state.latency, 3))
+        self.stats.set_value(f"{prefix}/error_rate", round(state.error_rate, 3))
+        self.stats.set_value(f"{prefix}/backoffs", state.backoffs)
+
+
+class CrawlMetrics:
+    """Derive throughput stats and export all crawl stats for Prometheus.
+
+    Sets ``items_per_second`` and ``source/<name>/items_per_second`` from the
+    items scraped so far and the time since the crawl started, then writes
+    every stat to ``METRICS_TEXTFILE_PATH`` in the Prometheus text format
+    (see ``jobcrawler.metrics``): every ``METRICS_TEXTFILE_INTERVAL`` seconds
+    and once more when the spider closes.  Without a path only the stats are
+    derived; ``jobcrawler.runner`` uses that in its workers and writes one
+    file for the merged stats instead.
+    """
+
+    def __init__(self, crawler):
+        self.stats = crawler.stats
+        self.path = crawler.settings.get("METRICS_TEXTFILE_PATH")
+        self.interval = crawler.settings.getfloat("METRICS_TEXTFILE_INTERVAL", 30.0)
+        self.task = None
+        crawler.signals.connect(self.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def spider_opened(self, spider):
+        if self.path and self.interval > 0:
+            self.task = task.LoopingCall(self.export)
+            self.task.start(self.interval, now=False)
+
+    def spider_closed(self, spider, reason):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+        self.export()
+
+    def export(self):
+        self._derive_rates()
+        if not self.path:
+            return
+        try:
+            metrics.write_textfile(self.path, self.stats.get_stats())
+        except OSError as exc:
+            logger.warning("Could not write metrics to %s: %s", self.path, exc)
+
+    def _derive_rates(self):
+        started = self.stats.get_value("start_time")
+        if started is None:
+            return
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        if elapsed <= 0:
+            return
+        self.stats.set_value(
+            "items_per_second",
+            round(self.stats.get_value("item_scraped_count", 0) / elapsed, 3),
+        )
+        for key, value in list(self.stats.get_stats().items()):
+            if key.startswith("source/") and key.endswith("/items"):
+                self.stats.set_value(f"{key}_per_second", round(value / elapsed, 3))
+
+
+def _ewma(previous, value, alpha):
+    return value if not previous else alpha * value + (1 - alpha) * previous
+
+
+def _retry_after(response):
+    """Seconds requested by a ``Retry-After`` header, or 0 if absent/invalid."""
+    value = response.headers.get(b"Retry-After")
+    if not value:
+        return 0.0
+    value = value.decode("latin-1").strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,202 @@
+"""Job extraction helpers for HTML listing pages.
+
+``structured_jobs`` reads the machine-readable data many job boards embed —
+schema.org ``JobPosting`` objects in JSON-LD and the Next.js
+``__NEXT_DATA__`` payload — and returns ``_make_item`` keyword arguments.
+``link_candidates`` is the fallback: one XPath pass over the anchors that
+returns ``(href, text)`` pairs with whitespace already collapsed.
+``next_page_hint`` tells from the same markup whether a listing goes on.
+"""
+
+import json
+import re
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Anchor texts that are navigation rather than job titles.
+TITLE_NOISE = frozenset({
+    "careers",
+    "jobs",
+    "job board",
+    "view all jobs",
+    "learn more",
+    "read more",
+    "apply",
+    "apply now",
+    "see more",
+    "next",
+    "previous",
+})
+
+# Links whose href contains one of these are preferred over every other anchor.
+JOB_HREF_MARKERS = ("/job/", "job-board", "jobs")
+
+# ``__NEXT_DATA__`` keys that hold a listing's page count.
+PAGE_COUNT_KEYS = ("totalPages", "total_pages", "pageCount", "page_count", "lastPage", "last_page")
+
+
+def looks_like_job_title(title):
+    text = (title or "").strip().lower()
+    return len(text) >= 5 and text not in TITLE_NOISE
+
+
+def link_candidates(response):
+    """Return ``(href, text)`` for the page's job-like links.
+
+    Falls back to every anchor when none of the hrefs look like job links.
+    """
+    preferred, others = [], []
+    for anchor in response.xpath("//a[@href]"):
+        node = anchor.root
+        href = (node.get("href") or "").strip()
+        if not href or href.startswith("#"):
+            continue
+        text = WHITESPACE_RE.sub(" ", "".join(node.itertext())).strip()
+        target = preferred if any(marker in href for marker in JOB_HREF_MARKERS) else others
+        target.append((href, text))
+    return preferred or others
+
+
+def structured_jobs(response):
+    """Return the jobs embedded as JSON-LD or ``__NEXT_DATA__``, if any."""
+    jobs = []
+    for payload in response.xpath('//script[@type="application/ld+json"]/text()').getall():
+        for node in _walk(_loads(payload)):
+            if _is_job_posting(node):
+                job = _from_job_posting(node, response)
+                if job:
+                    jobs.append(job)
+    if jobs:
+        return jobs
+
+    payload = response.xpath('//script[@id="__NEXT_DATA__"]/text()').get()
+    if payload:
+        for node in _walk(_loads(payload)):
+            job = _from_next_data(node, response)
+            if job:
+                jobs.append(job)
+    return jobs
+
+
+def next_page_hint(response, next_url, page):
+    """Return whether the listing continues past ``page``, or None if unknown.
+
+    True when the page links to ``next_url`` (pagination controls or
+    ``rel="next"``) or its ``__NEXT_DATA__`` reports more than ``page``
+    pages; False when that page count is ``page`` or less.
+    """
+    if response.xpath('//a[@rel="next"]|//link[@rel="next"]'):
+        return True
+    target = next_url.split("#", 1)[0].rstrip("/")
+    for href in response.xpath("//a/@href").getall():
+        if response.urljoin(href.strip()).split("#", 1)[0].rstrip("/") == target:
+            return True
+
+    payload = response.xpath('//script[@id="__NEXT_DATA__"]/text()').get()
+    if payload:
+        for node in _walk(_loads(payload)):
+            for key in PAGE_COUNT_KEYS:
+                count = node.get(key)
+                if isinstance(count, int) and not isinstance(count, bool):
+                    return count > page
+    return None
+
+
+def _loads(payload):
+    try:
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def _walk(value):
+    """Yield every dict nested anywhere in ``value``."""
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            yield value
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+
+
+def _is_job_posting(node):
+    kind = node.get("@type")
+    return kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind)
+
+
+def _text(value):
+    if isinstance(value, str):
+        return WHITESPACE_RE.sub(" ", value).strip() or None
+    return None
+
+
+def _from_job_posting(node, response):
+    title = _text(node.get("title"))
+    url = _text(node.get("url")) or _text(node.get("sameAs"))
+    organization = node.get("hiringOrganization")
+    company = _text(organization.get("name")) if isinstance(organization, dict) else _text(organization)
+    if not title or not url or not company:
+        return None
+
+    employment_type = node.get("employmentType")
+    if isinstance(employment_type, list):
+        employment_type = ", ".join(str(part) for part in employment_type)
+
+    identifier = node.get("identifier")
+    if isinstance(identifier, dict):
+        identifier = identifier.get("value")
+
+    return {
+        "title": title,
+        "job_url": response.urljoin(url),
+        "company_name": company,
+        "location": _job_location(node.get("jobLocation")),
+        "employment_type": _text(employment_type),
+        "external_id": f"kalibrr-{identifier}" if identifier else None,
+    }
+
+
+def _job_location(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if not isinstance(value, dict):
+        return None
+    address = value.get("address")
+    if not isinstance(address, dict):
+        return _text(address)
+    parts = [
+        _text(address.get(key))
+        for key in ("addressLocality", "addressRegion", "addressCountry")
+    ]
+    return ", ".join(part for part in parts if part) or None
+
+
+def _from_next_data(node, response):
+    # Listing entries in Kalibrr's Next.js payload carry an id, a name and
+    # a nested company; their page lives at /c/<company code>/jobs/<id>/<slug>.
+    company = node.get("company")
+    title = _text(node.get("name")) or _text(node.get("title"))
+    job_id = node.get("id")
+    if not isinstance(company, dict) or not title or job_id is None:
+        return None
+    company_name = _text(company.get("name"))
+    if not company_name:
+        return None
+
+    url = _text(node.get("url"))
+    if url is None:
+        code = _text(company.get("code"))
+        if code is None:
+            return None
+        url = f"/c/{code}/jobs/{job_id}/{_text(node.get('slug')) or ''}".rstrip("/")
+
+    return {
+        "title": title,
+        "job_url": response.urljoin(url),
+        "company_name": company_name,
+        "location": _text(node.get("location")) or _text(node.get("google_location")),
+        "employment_type": _text(node.get("tenure")) or _text(node.get("employment_type")),
+        "external_id": f"kalibrr-{job_id}",
+    }
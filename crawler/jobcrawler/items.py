@@ -9,3 +9,8 @@ class JobItem(scrapy.Item):
     job_url = scrapy.Field()
     company_name = scrapy.Field()
     career_page_url = scrapy.Field()
+    source = scrapy.Field()
+    # Set by DedupPipeline
+    canonical_key = scrapy.Field()
+    simhash = scrapy.Field()
+    duplicate_of = scrapy.Field()
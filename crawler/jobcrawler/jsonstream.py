@@ -0,0 +1,62 @@
+"""JSON decoding helpers for source responses.
+
+Small bodies are decoded in one call, with orjson when it is installed.
+Large bodies are parsed incrementally with ijson: jobs are yielded while the
+array is being read, so the full object tree never exists at once.  Scrapy
+still buffers the raw body, so the saving is the decoded ``str`` copy and
+the tree of dicts built from it.
+
+Both libraries are optional; without them everything falls back to the
+standard library ``json`` module.
+"""
+
+import io
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional speedup
+    ijson = None
+
+# Everything ``loads``/``iter_items`` raise on malformed input.
+DECODE_ERRORS = (ValueError,) + ((ijson.JSONError,) if ijson is not None else ())
+
+
+def can_stream():
+    return ijson is not None
+
+
+def loads(body):
+    """Decode a complete JSON document from ``body`` bytes."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def iter_items(body, items_key):
+    """Yield the elements of the top-level ``items_key`` array one at a time."""
+    return ijson.items(io.BytesIO(body), f"{items_key}.item", use_float=True)
+
+
+def select(body, paths):
+    """Return a nested dict holding only the dotted ``paths`` found in ``body``.
+
+    Each path is a separate pass over ``body``; the ijson backends skip
+    everything outside the path without building Python objects for it.
+    """
+    data = {}
+    for path in paths:
+        value = next(ijson.items(io.BytesIO(body), path, use_float=True), None)
+        if value is None:
+            continue
+        *parents, leaf = path.split(".")
+        target = data
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = value
+    return data
@@ -0,0 +1,83 @@
+"""Render crawl stats in the Prometheus text exposition format.
+
+Stat keys that carry a source or domain become one metric with a label,
+e.g. ``source/Remotive/download_seconds`` is exported as
+``jobcrawler_source_download_seconds{source="Remotive"}``.  Any other
+numeric stat is exported under its key, and datetimes as Unix timestamps.
+Every value describes one crawl, so all metrics are gauges.
+
+The file is meant for node_exporter's textfile collector: it is written to
+a temporary name and renamed so the collector never reads half a file.
+"""
+
+import os
+import re
+from datetime import datetime
+
+PREFIX = "jobcrawler"
+
+# Tried in order; the first pattern that matches the whole key wins.
+LABELLED_STATS = (
+    (re.compile(r"source/(?P<source>[^/]+)/(?P<metric>failures|parse_errors)/(?P<error>[^/]+)"),
+     "source_{metric}"),
+    (re.compile(r"source/(?P<source>[^/]+)/status/(?P<status>\d+)"), "source_responses_by_status"),
+    (re.compile(r"source/(?P<source>[^/]+)/(?P<metric>[^/]+)"), "source_{metric}"),
+    (re.compile(r"pipeline/source/(?P<source>[^/]+)/(?P<metric>[^/]+)"), "pipeline_source_{metric}"),
+    (re.compile(r"throttle/(?P<domain>[^/]+)/(?P<metric>[^/]+)"), "throttle_{metric}"),
+)
+INVALID_NAME_RE = re.compile(r"[^a-zA-Z0-9_]+")
+
+
+def _metric_name(name):
+    return f"{PREFIX}_{INVALID_NAME_RE.sub('_', name).strip('_').lower()}"
+
+
+def _label_value(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(key, value):
+    """Return ``(metric, labels, value)`` for one stat, or None if not numeric."""
+    if isinstance(value, datetime):
+        value = value.timestamp()
+    elif isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    for pattern, template in LABELLED_STATS:
+        match = pattern.fullmatch(key)
+        if match:
+            labels = {k: v for k, v in match.groupdict().items() if k != "metric"}
+            return _metric_name(template.format(**match.groupdict())), labels, value
+    return _metric_name(key), {}, value
+
+
+def render(stats):
+    """Return ``stats`` as Prometheus text."""
+    metrics = {}
+    for key, value in stats.items():
+        sample = _sample(key, value)
+        if sample is not None:
+            name, sample_labels, value = sample
+            metrics.setdefault(name, []).append((sample_labels, value))
+
+    lines = []
+    for name in sorted(metrics):
+        lines.append(f"# TYPE {name} gauge")
+        for sample_labels, value in sorted(metrics[name], key=lambda sample: sorted(sample[0].items())):
+            if sample_labels:
+                text = ",".join(
+                    f'{label}="{_label_value(str(v))}"' for label, v in sorted(sample_labels.items())
+                )
+                lines.append(f"{name}{{{text}}} {value}")
+            else:
+                lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path, stats):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        fh.write(render(stats))
+    os.replace(tmp_path, path)
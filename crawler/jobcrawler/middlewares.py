@@ -3,21 +3,47 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import hashlib
+import json
+import logging
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process crawls only
+    fcntl = None
+
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import Request
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+logger = logging.getLogger(__name__)
 
 class JobcrawlerSpiderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the spider middleware does not modify the
-    # passed objects.
+    """Per-source parse timing and output counts.
+
+    The spider's callbacks are generators, so the time spent producing each
+    output is measured around ``next()``; item pipelines, which run between
+    two outputs, are not included.  Per response, the middleware records
+    ``source/<name>/parse_seconds`` (sum and ``_max``),
+    ``source/<name>/parsed_responses``, ``source/<name>/items`` and
+    ``source/<name>/requests``; exceptions raised while parsing are counted
+    as ``source/<name>/parse_errors/<class>`` and the source is added to the
+    spider's ``failed_sources``: a half-parsed listing must not be treated
+    as complete by the stale-job sweep.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
 
     @classmethod
     def from_crawler(cls, crawler):
         # This method is used by Scrapy to create your spiders.
-        s = cls()
+        s = cls(stats=crawler.stats)
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
         return s
 
@@ -33,15 +59,45 @@ class JobcrawlerSpiderMiddleware:
         # it has processed the response.
 
         # Must return an iterable of Request, or item objects.
-        for i in result:
-            yield i
+        source = response.meta.get("source_name", "unknown")
+        elapsed = 0.0
+        items = requests = 0
+        outputs = iter(result)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    output = next(outputs)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - started
+                if isinstance(output, Request):
+                    requests += 1
+                else:
+                    items += 1
+                yield output
+        finally:
+            if self.stats is not None:
+                self.stats.inc_value(f"source/{source}/parsed_responses")
+                self.stats.inc_value(f"source/{source}/parse_seconds", elapsed)
+                self.stats.max_value(f"source/{source}/parse_seconds_max", elapsed)
+                self.stats.inc_value(f"source/{source}/items", items)
+                self.stats.inc_value(f"source/{source}/requests", requests)
 
     def process_spider_exception(self, response, exception, spider):
         # Called when a spider or process_spider_input() method
         # (from other spider middleware) raises an exception.
 
         # Should return either None or an iterable of Request or item objects.
-        pass
+        source = response.meta.get("source_name", "unknown")
+        if self.stats is not None:
+            self.stats.inc_value(
+                f"source/{source}/parse_errors/{type(exception).__name__}"
+            )
+        failed = getattr(spider, "failed_sources", None)
+        if failed is not None and "source_name" in response.meta:
+            failed.add(source)
 
     async def process_start(self, start):
         # Called with an async iterator over the spider start() method or the
@@ -54,36 +110,91 @@ class JobcrawlerSpiderMiddleware:
 
 
 class JobcrawlerDownloaderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the downloader middleware does not modify the
-    # passed objects.
+    """Conditional GETs and unchanged-body detection for source URLs.
+
+    For every URL that returned 200 the middleware remembers its ``ETag``,
+    ``Last-Modified`` and a SHA-256 of the body in a JSON file
+    (``CONDITIONAL_STORE_PATH``).  The next run sends ``If-None-Match`` /
+    ``If-Modified-Since``; a 304, or a 200 whose body hashes the same as
+    last time, is dropped with ``IgnoreRequest`` before any parsing or
+    pipeline work.  The request is flagged with ``meta["source_unchanged"]``
+    so the spider does not count it as a failure.
+
+    Requests with ``meta["conditional"] = False`` bypass the validators; the
+    spider uses that for every page after a source's first one.
+
+    Every response is also measured, conditional or not:
+    ``source/<name>/download_seconds`` (sum and ``_max``, from Scrapy's
+    ``download_latency``), ``source/<name>/responses``,
+    ``source/<name>/response_bytes`` and ``source/<name>/status/<code>``.
+
+    The store is only written when the crawl finishes cleanly, and entries
+    of sources that failed during the run are not updated, so a body that
+    was never fully processed is fetched and parsed again next time.  That
+    includes sources whose items ``PostgresPipeline`` could not commit: it
+    adds them to ``failed_sources``, and item pipelines are closed before
+    ``spider_closed`` fires.
+    """
+
+    def __init__(self, store_path, enabled=True, stats=None):
+        self.store_path = store_path
+        self.enabled = enabled
+        self.stats = stats
+        self._entries = {}
+        self._updated = {}
 
     @classmethod
     def from_crawler(cls, crawler):
         # This method is used by Scrapy to create your spiders.
-        s = cls()
+        s = cls(
+            store_path=crawler.settings.get(
+                "CONDITIONAL_STORE_PATH", ".crawlstate/http_validators.json"
+            ),
+            enabled=crawler.settings.getbool("CONDITIONAL_REQUESTS_ENABLED", True),
+            stats=crawler.stats,
+        )
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
         return s
 
     def process_request(self, request, spider):
-        # Called for each request that goes through the downloader
-        # middleware.
-
-        # Must either:
-        # - return None: continue processing this request
-        # - or return a Response object
-        # - or return a Request object
-        # - or raise IgnoreRequest: process_exception() methods of
-        #   installed downloader middleware will be called
+        if not self.enabled or not request.meta.get("conditional", True):
+            return None
+        entry = self._entries.get(request.url)
+        if entry:
+            if entry.get("etag"):
+                request.headers.setdefault("If-None-Match", entry["etag"])
+            if entry.get("last_modified"):
+                request.headers.setdefault("If-Modified-Since", entry["last_modified"])
         return None
 
     def process_response(self, request, response, spider):
-        # Called with the response returned from the downloader.
+        self._record_download(request, response)
+        if not self.enabled or not request.meta.get("conditional", True):
+            return response
+
+        entry = self._entries.get(request.url)
+        if response.status == 304 and entry:
+            self._inc_stat("conditional/not_modified")
+            self._inc_stat("conditional/bytes_saved", entry.get("length", 0))
+            request.meta["source_unchanged"] = True
+            raise IgnoreRequest(f"Not modified: {request.url}")
+        if response.status != 200:
+            return response
 
-        # Must either;
-        # - return a Response object
-        # - return a Request object
-        # - or raise IgnoreRequest
+        digest = hashlib.sha256(response.body).hexdigest()
+        self._updated[request.url] = {
+            "source": request.meta.get("source_name"),
+            "etag": _header(response, b"ETag"),
+            "last_modified": _header(response, b"Last-Modified"),
+            "sha256": digest,
+            "length": len(response.body),
+        }
+        if entry and entry.get("sha256") == digest:
+            self._inc_stat("conditional/unchanged_body")
+            self._inc_stat("conditional/parse_skipped_bytes", len(response.body))
+            request.meta["source_unchanged"] = True
+            raise IgnoreRequest(f"Body unchanged: {request.url}")
         return response
 
     def process_exception(self, request, exception, spider):
@@ -98,3 +209,62 @@ class JobcrawlerDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+        if self.enabled:
+            self._entries = self._load()
+
+    def spider_closed(self, spider, reason):
+        if not self.enabled or reason != "finished":
+            return
+        failed = getattr(spider, "failed_sources", set())
+        accepted = {
+            url: entry for url, entry in self._updated.items()
+            if entry["source"] not in failed
+        }
+        self._save(accepted)
+
+    def _inc_stat(self, key, count=1):
+        if self.stats is not None:
+            self.stats.inc_value(key, count)
+
+    def _record_download(self, request, response):
+        if self.stats is None:
+            return
+        source = request.meta.get("source_name", "unknown")
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            self.stats.inc_value(f"source/{source}/download_seconds", latency)
+            self.stats.max_value(f"source/{source}/download_seconds_max", latency)
+        self.stats.inc_value(f"source/{source}/responses")
+        self.stats.inc_value(f"source/{source}/response_bytes", len(response.body))
+        self.stats.inc_value(f"source/{source}/status/{response.status}")
+
+    def _load(self):
+        try:
+            with open(self.store_path, encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable validator store %s: %s", self.store_path, exc)
+            return {}
+
+    def _save(self, accepted):
+        # Workers of jobcrawler.runner share the store: re-read it under a
+        # lock and only overwrite the URLs this process fetched.
+        directory = os.path.dirname(self.store_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.store_path}.lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = self._load()
+            entries.update(accepted)
+            tmp_path = f"{self.store_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(entries, fh)
+            os.replace(tmp_path, self.store_path)
+
+
+def _header(response, name):
+    value = response.headers.get(name)
+    return value.decode("latin-1") if value else None
@@ -0,0 +1,232 @@
+"""Run ``CompanySpider`` across several worker processes.
+
+Sources are grouped by domain, so per-domain politeness limits and
+duplicate detection still apply within one process, and the groups are
+spread over ``--workers`` processes by their page budget.  Every worker runs
+its own Twisted reactor, spider and ``PostgresPipeline`` connection, joined
+to one crawl run that the parent starts before the workers and finishes
+after them: the stale-job sweep and the data version bump happen once, for
+the union of the sources the workers completed.
+
+Usage, from the ``crawler`` directory::
+
+    python -m jobcrawler.runner --workers 4 --report run-report.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from jobcrawler import metrics
+from jobcrawler.pipelines import PostgresPipeline
+from jobcrawler.sources import SOURCES
+
+logger = logging.getLogger(__name__)
+
+
+def plan_shards(sources, workers):
+    """Split ``sources`` into at most ``workers`` lists of source names."""
+    groups = {}
+    for source in sources:
+        domain = urlsplit(source["url"]).hostname or source["name"]
+        groups.setdefault(domain, []).append(source)
+
+    # Longest-processing-time first: heaviest domain to the lightest shard.
+    weighted = sorted(
+        groups.values(),
+        key=lambda group: sum(source.get("max_pages", 1) for source in group),
+        reverse=True,
+    )
+    shards = [[] for _ in range(max(1, min(workers, len(weighted))))]
+    loads = [0] * len(shards)
+    for group in weighted:
+        target = loads.index(min(loads))
+        shards[target].extend(source["name"] for source in group)
+        loads[target] += sum(source.get("max_pages", 1) for source in group)
+    return [shard for shard in shards if shard]
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _crawl_shard(run_id, source_names, results):
+    # Imported here so the parent never installs a reactor.
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+
+    from jobcrawler.spiders.company_spider import CompanySpider
+
+    settings = get_project_settings()
+    settings.set("POSTGRES_RUN_ID", run_id)
+    # The parent exports the merged stats; workers would overwrite each other.
+    settings.set("METRICS_TEXTFILE_PATH", None)
+    process = CrawlerProcess(settings)
+    crawler = process.create_crawler(CompanySpider)
+    process.crawl(crawler, sources=",".join(source_names))
+    process.start()
+
+    spider = crawler.spider
+    results.put({
+        "sources": source_names,
+        "completed": sorted(spider.completed_sources()),
+        "failed": sorted(spider.failed_sources),
+        "unchanged": sorted(spider.unchanged_sources),
+        "truncated": sorted(spider.truncated_sources),
+        "stats": {key: _jsonable(value) for key, value in crawler.stats.get_stats().items()},
+    })
+
+
+# Worker stats that are levels rather than counts: merged with max().
+GAUGE_KEYS = frozenset({
+    "elapsed_time_seconds",
+    "memusage/startup",
+    "pipeline/dedup/preloaded",
+    "pipeline/company_cache/preloaded",
+    "pipeline/run_id",
+    "pipeline/data_version",
+})
+GAUGE_PREFIXES = ("throttle/",)
+GAUGE_SUFFIXES = ("_max", "/max", "/truncated")
+
+
+def _is_gauge(key):
+    return key in GAUGE_KEYS or key.startswith(GAUGE_PREFIXES) or key.endswith(GAUGE_SUFFIXES)
+
+
+def merge_stats(reports, elapsed=None):
+    """Combine worker stats into one run's.
+
+    Counters are summed.  Gauges and maxima take the largest worker value,
+    ``start_time``/``finish_time`` the earliest/latest.  With ``elapsed``
+    (the parent's wall clock) ``elapsed_time_seconds`` is that time, and the
+    ``*_per_second`` rates are recomputed from the summed counts over it.
+    """
+    merged = {}
+    for report in reports:
+        for key, value in report["stats"].items():
+            if elapsed and key.endswith("_per_second"):
+                continue
+            if key not in merged or merged[key] == value:
+                merged[key] = value
+            elif key == "start_time":
+                merged[key] = min(merged[key], value)
+            elif key == "finish_time" or _is_gauge(key):
+                merged[key] = max(merged[key], value)
+            elif isinstance(value, (int, float)) and isinstance(merged[key], (int, float)):
+                merged[key] += value
+            else:
+                merged[key] = value
+
+    if elapsed:
+        merged["elapsed_time_seconds"] = round(elapsed, 3)
+        merged["items_per_second"] = round(merged.get("item_scraped_count", 0) / elapsed, 3)
+        for key, value in list(merged.items()):
+            if key.startswith("source/") and key.endswith("/items"):
+                merged[f"{key}_per_second"] = round(value / elapsed, 3)
+    return merged
+
+
+def run(workers, source_names=None):
+    sources = [
+        source for source in SOURCES
+        if source_names is None or source["name"] in source_names
+    ]
+    shards = plan_shards(sources, workers)
+
+    coordinator = PostgresPipeline()
+    run_id = coordinator.begin_run()
+    logger.info("Crawl run %s: %d workers, shards %s", run_id, len(shards), shards)
+
+    started = time.monotonic()
+    ctx = multiprocessing.get_context("spawn")
+    reports_queue = ctx.Queue()
+    processes = [
+        ctx.Process(target=_crawl_shard, args=(run_id, shard, reports_queue), name=f"crawl-{n}")
+        for n, shard in enumerate(shards)
+    ]
+    for process in processes:
+        process.start()
+
+    # Drain the queue before joining, or a worker can block on a full pipe.
+    reports = []
+    while len(reports) < len(processes) and any(p.is_alive() for p in processes):
+        try:
+            reports.append(reports_queue.get(timeout=1))
+        except queue.Empty:
+            continue
+    while not reports_queue.empty():
+        reports.append(reports_queue.get())
+    for process in processes:
+        process.join()
+
+    # A worker that died without reporting counts all of its sources as failed.
+    reported = {name for report in reports for name in report["sources"]}
+    lost = [name for shard in shards for name in shard if name not in reported]
+
+    completed = {name for report in reports for name in report["completed"]}
+    failed = {name for report in reports for name in report["failed"]} | set(lost)
+    deactivated, version = coordinator.end_run(completed, failed)
+    elapsed = time.monotonic() - started
+    stats = merge_stats(reports, elapsed)
+    _export_metrics(stats)
+
+    return {
+        "run_id": run_id,
+        "workers": len(shards),
+        "shards": shards,
+        "elapsed_seconds": round(elapsed, 3),
+        "completed_sources": sorted(completed),
+        "failed_sources": sorted(failed),
+        "unchanged_sources": sorted(
+            name for report in reports for name in report["unchanged"]
+        ),
+        "truncated_sources": sorted(
+            name for report in reports for name in report["truncated"]
+        ),
+        "deactivated_jobs": deactivated,
+        "data_version": version,
+        "stats": stats,
+    }
+
+
+def _export_metrics(stats):
+    from scrapy.utils.project import get_project_settings
+
+    path = get_project_settings().get("METRICS_TEXTFILE_PATH")
+    if not path:
+        return
+    try:
+        metrics.write_textfile(path, stats)
+    except OSError as exc:
+        logger.warning("Could not write metrics to %s: %s", path, exc)
+
+
+def main():
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "jobcrawler.settings")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sources", nargs="+", help="only crawl these SOURCES names")
+    parser.add_argument("--report", help="write the merged run report as JSON to this path")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    report = run(args.workers, set(args.sources) if args.sources else None)
+    print(json.dumps({key: value for key, value in report.items() if key != "stats"}, indent=2))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Crawl each source when it is due, instead of everything on one cron.
+
+Every ``SOURCES`` entry has a ``refresh_interval``.  After each crawl the
+scheduler records the source's churn — the share of its jobs that were new
+or changed, from the pipeline's content-hash counts — as an exponentially
+weighted average, and stretches or shortens the interval towards
+``SCHEDULER_TARGET_CHURN``: a source that changes little is crawled less
+often, one that changes a lot more often, within a factor of four of its
+configured interval.
+
+A source is due once the time since its last crawl reaches that learned
+interval.  Due sources are ranked by staleness × churn and the top
+``SCHEDULER_CAPACITY`` are crawled together through ``runner.run``.  Failed
+sources back off exponentially before they are retried.  The state lives in
+the ``source_schedule`` table, so restarts keep what was learned.
+
+Usage, from the ``crawler`` directory::
+
+    python -m jobcrawler.scheduler run --workers 2
+    python -m jobcrawler.scheduler queue
+"""
+
+import argparse
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+
+from jobcrawler import runner
+from jobcrawler.pipelines import database_url
+from jobcrawler.sources import SOURCES
+
+logger = logging.getLogger(__name__)
+
+# Churn assumed for a source that has never been crawled.
+PRIOR_CHURN = 0.5
+# Weight of the latest crawl in the churn average.
+CHURN_ALPHA = 0.3
+# Learned intervals stay within this factor of the configured one.
+INTERVAL_SCALE = 4.0
+# Keeps a source that never changes from dropping out of the ranking.
+CHURN_FLOOR = 0.05
+RETRY_BASE_SECONDS = 300
+
+
+class Scheduler:
+    """Persisted per-source crawl state and the due-source queue."""
+
+    def __init__(self, sources=SOURCES, default_interval=3600, target_churn=0.2,
+                 capacity=4, workers=1):
+        self.sources = {source["name"]: source for source in sources}
+        self.default_interval = default_interval
+        self.target_churn = target_churn
+        self.capacity = capacity
+        self.workers = workers
+        self.conn = psycopg2.connect(database_url())
+        self.cur = self.conn.cursor()
+
+    @classmethod
+    def from_settings(cls, settings, **kwargs):
+        return cls(
+            default_interval=settings.getint("SCHEDULER_DEFAULT_INTERVAL", 3600),
+            target_churn=settings.getfloat("SCHEDULER_TARGET_CHURN", 0.2),
+            capacity=settings.getint("SCHEDULER_CAPACITY", 4),
+            **kwargs,
+        )
+
+    def close(self):
+        self.cur.close()
+        self.conn.close()
+
+    def ensure_table(self):
+        self.cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS source_schedule (
+                source TEXT PRIMARY KEY,
+                last_crawled_at TIMESTAMPTZ,
+                last_status TEXT,
+                churn DOUBLE PRECISION NOT NULL DEFAULT %s,
+                crawls INTEGER NOT NULL DEFAULT 0,
+                failures INTEGER NOT NULL DEFAULT 0,
+                last_written INTEGER,
+                last_unchanged INTEGER,
+                last_run_id INTEGER,
+                retry_at TIMESTAMPTZ
+            );
+            """,
+            (PRIOR_CHURN,),
+        )
+        self.conn.commit()
+
+    # ── queue ───────────────────────────────────────────────────────────
+    def interval(self, name, churn):
+        """Return the learned refresh interval of ``name`` in seconds."""
+        base = self.sources[name].get("refresh_interval", self.default_interval)
+        scale = self.target_churn / max(churn, 1e-6)
+        return base * min(max(scale, 1 / INTERVAL_SCALE), INTERVAL_SCALE)
+
+    def queue(self, now=None):
+        """Return every source with its schedule, highest priority first."""
+        now = now or datetime.now(timezone.utc)
+        self.cur.execute(
+            """
+            SELECT source, last_crawled_at, last_status, churn, crawls, retry_at
+            FROM source_schedule
+            """
+        )
+        state = {row[0]: row[1:] for row in self.cur.fetchall()}
+        self.conn.commit()
+
+        entries = []
+        for name in self.sources:
+            last_crawled_at, status, churn, crawls, retry_at = state.get(
+                name, (None, None, PRIOR_CHURN, 0, None)
+            )
+            interval = self.interval(name, churn)
+            if last_crawled_at is None:
+                staleness = float("inf")
+            else:
+                staleness = (now - last_crawled_at).total_seconds() / interval
+            entries.append({
+                "source": name,
+                "last_crawled_at": last_crawled_at,
+                "last_status": status,
+                "crawls": crawls,
+                "churn": round(churn, 3),
+                "interval_seconds": round(interval),
+                "staleness": staleness,
+                "priority": staleness * (CHURN_FLOOR + churn),
+                "retry_at": retry_at,
+                "due": staleness >= 1 and (retry_at is None or retry_at <= now),
+            })
+        entries.sort(key=lambda entry: (entry["due"], entry["priority"]), reverse=True)
+        return entries
+
+    def due(self, now=None):
+        """Return the names of the sources to crawl next, at most ``capacity``."""
+        return [entry["source"] for entry in self.queue(now) if entry["due"]][: self.capacity]
+
+    # ── crawling ────────────────────────────────────────────────────────
+    def run_once(self):
+        """Crawl the due sources, record the outcome; return the run report or None."""
+        names = self.due()
+        if not names:
+            return None
+        logger.info("Crawling due sources: %s", ", ".join(names))
+        report = runner.run(self.workers, set(names))
+        self.record(report, names)
+        return report
+
+    def record(self, report, names):
+        now = datetime.now(timezone.utc)
+        stats = report["stats"]
+        failed = set(report["failed_sources"])
+        for name in names:
+            written = stats.get(f"pipeline/source/{name}/written", 0)
+            kept = stats.get(f"pipeline/source/{name}/unchanged", 0)
+            # Sources that returned nothing are not swept, but were still
+            # crawled; only real failures are retried with backoff.
+            if name not in failed:
+                # A 304 or an identical body means nothing changed at all.
+                observed = written / (written + kept) if written + kept else 0.0
+                self._record_success(name, now, observed, written, kept, report["run_id"])
+            else:
+                self._record_failure(name, now, report["run_id"])
+        self.conn.commit()
+
+    def _record_success(self, name, now, observed, written, kept, run_id):
+        self.cur.execute(
+            """
+            INSERT INTO source_schedule AS s
+                (source, last_crawled_at, last_status, churn, crawls, failures,
+                 last_written, last_unchanged, last_run_id, retry_at)
+            VALUES (%(source)s, %(now)s, 'ok', %(prior)s * (1 - %(alpha)s) + %(observed)s * %(alpha)s,
+                    1, 0, %(written)s, %(kept)s, %(run_id)s, NULL)
+            ON CONFLICT (source) DO UPDATE SET
+                last_crawled_at = EXCLUDED.last_crawled_at,
+                last_status = 'ok',
+                churn = s.churn * (1 - %(alpha)s) + %(observed)s * %(alpha)s,
+                crawls = s.crawls + 1,
+                failures = 0,
+                last_written = EXCLUDED.last_written,
+                last_unchanged = EXCLUDED.last_unchanged,
+                last_run_id = EXCLUDED.last_run_id,
+                retry_at = NULL
+            """,
+            {
+                "source": name, "now": now, "prior": PRIOR_CHURN, "alpha": CHURN_ALPHA,
+                "observed": observed, "written": written, "kept": kept, "run_id": run_id,
+            },
+        )
+
+    def _record_failure(self, name, now, run_id):
+        # last_crawled_at is left alone so the source stays due; retry_at
+        # holds it back for 5, 10, 20 ... minutes, capped at its interval.
+        self.cur.execute(
+            "SELECT failures, churn FROM source_schedule WHERE source = %s", (name,)
+        )
+        row = self.cur.fetchone()
+        failures, churn = row if row else (0, PRIOR_CHURN)
+        delay = min(RETRY_BASE_SECONDS * 2 ** failures, self.interval(name, churn))
+        self.cur.execute(
+            """
+            INSERT INTO source_schedule AS s
+                (source, last_status, failures, last_run_id, retry_at)
+            VALUES (%s, 'failed', 1, %s, %s)
+            ON CONFLICT (source) DO UPDATE SET
+                last_status = 'failed',
+                failures = s.failures + 1,
+                last_run_id = EXCLUDED.last_run_id,
+                retry_at = EXCLUDED.retry_at
+            """,
+            (name, run_id, now + timedelta(seconds=delay)),
+        )
+        logger.warning("Source %s failed; retrying in %d s", name, delay)
+
+    def serve(self, poll_seconds):
+        """Crawl due sources forever, sleeping ``poll_seconds`` when none are due."""
+        while True:
+            try:
+                report = self.run_once()
+            except psycopg2.Error as exc:
+                self.conn.rollback()
+                logger.error("Scheduler cycle failed: %s", exc)
+                report = None
+            if report is None:
+                time.sleep(poll_seconds)
+
+
+def _format_time(value):
+    return value.strftime("%Y-%m-%d %H:%M") if value else "-"
+
+
+def print_queue(entries):
+    print(f"{'source':<24} {'due':<4} {'priority':>9} {'stale':>7} {'churn':>6} "
+          f"{'interval':>9} {'crawls':>6}  {'last crawl':<16}  status")
+    for entry in entries:
+        stale = "never" if entry["staleness"] == float("inf") else f"{entry['staleness']:.2f}"
+        priority = "inf" if entry["priority"] == float("inf") else f"{entry['priority']:.3f}"
+        status = entry["last_status"] or "-"
+        if entry["retry_at"]:
+            status += f" (retry {_format_time(entry['retry_at'])})"
+        print(
+            f"{entry['source']:<24} {'yes' if entry['due'] else 'no':<4} {priority:>9} "
+            f"{stale:>7} {entry['churn']:>6.3f} {entry['interval_seconds']:>8}s "
+            f"{entry['crawls']:>6}  {_format_time(entry['last_crawled_at']):<16}  {status}"
+        )
+
+
+def main():
+    os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "jobcrawler.settings")
+    from scrapy.utils.project import get_project_settings
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="crawl due sources until interrupted")
+    run_parser.add_argument("--workers", type=int, default=1)
+    run_parser.add_argument("--once", action="store_true", help="run a single cycle and exit")
+    commands.add_parser("queue", help="print every source's schedule and priority")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    settings = get_project_settings()
+    scheduler = Scheduler.from_settings(settings, workers=getattr(args, "workers", 1))
+    try:
+        scheduler.ensure_table()
+        if args.command == "queue":
+            print_queue(scheduler.queue())
+        elif args.once:
+            scheduler.run_once()
+        else:
+            scheduler.serve(settings.getfloat("SCHEDULER_POLL_SECONDS", 60))
+    finally:
+        scheduler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,11 @@ ROBOTSTXT_OBEY = True
 CONCURRENT_REQUESTS_PER_DOMAIN = 1
 DOWNLOAD_DELAY = 1
 
+# Pages fetched per paginated source unless its SOURCES entry sets max_pages
+SOURCE_MAX_PAGES = 10
+# JSON bodies larger than this many bytes are parsed incrementally with ijson
+JSON_STREAMING_THRESHOLD = 1024 * 1024
+
 # Disable cookies (enabled by default)
 #COOKIES_ENABLED = False
 
@@ -40,28 +45,83 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "jobcrawler.middlewares.JobcrawlerSpiderMiddleware": 543,
-#}
+SPIDER_MIDDLEWARES = {
+    "jobcrawler.middlewares.JobcrawlerSpiderMiddleware": 543,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "jobcrawler.middlewares.JobcrawlerDownloaderMiddleware": 543,
-#}
+DOWNLOADER_MIDDLEWARES = {
+    "jobcrawler.middlewares.JobcrawlerDownloaderMiddleware": 543,
+}
+
+# Send If-None-Match / If-Modified-Since for source URLs and skip responses
+# that are 304 or whose body hash matches the previous run.
+CONDITIONAL_REQUESTS_ENABLED = True
+# JSON file holding ETag / Last-Modified / body hash per URL between runs
+CONDITIONAL_STORE_PATH = ".crawlstate/http_validators.json"
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+EXTENSIONS = {
+    "jobcrawler.extensions.AdaptiveThrottle": 500,
+    "jobcrawler.extensions.CrawlMetrics": 510,
+}
+
+# Prometheus text-format dump of the crawl stats (per-source latency, bytes,
+# parse time, failures, DB round trips...) for node_exporter's textfile
+# collector, rewritten every METRICS_TEXTFILE_INTERVAL seconds. Leave the
+# path empty to keep the metrics in the Scrapy stats only.
+METRICS_TEXTFILE_PATH = ".crawlstate/metrics/jobcrawler.prom"
+METRICS_TEXTFILE_INTERVAL = 30.0
+
+# Per-domain delay/concurrency controller (jobcrawler.extensions). Starts from
+# DOWNLOAD_DELAY / CONCURRENT_REQUESTS_PER_DOMAIN and stays within the limits
+# declared in each SOURCES entry's "throttle" dict, or these defaults.
+ADAPTIVE_THROTTLE_ENABLED = True
+ADAPTIVE_THROTTLE_TARGET_LATENCY = 1.0
+ADAPTIVE_THROTTLE_INCREASE_AFTER = 10
+ADAPTIVE_THROTTLE_BACKOFF_DELAY = 1.0
+ADAPTIVE_THROTTLE_MAX_RETRY_AFTER = 300.0
+ADAPTIVE_THROTTLE_MIN_DELAY = 0.25
+ADAPTIVE_THROTTLE_MAX_DELAY = 60.0
+ADAPTIVE_THROTTLE_MIN_CONCURRENCY = 1
+ADAPTIVE_THROTTLE_MAX_CONCURRENCY = 1
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 ITEM_PIPELINES = {
+    "jobcrawler.pipelines.DedupPipeline": 200,
     "jobcrawler.pipelines.PostgresPipeline": 300,
 }
 
+# Collapse the same posting seen on several sources onto one job. Fuzzy
+# matches must share the company and differ in at most this many SimHash bits.
+DEDUP_ENABLED = True
+DEDUP_SIMHASH_DISTANCE = 3
+
+# PostgresPipeline write mode: "item" commits every job on its own, "batch"
+# buffers jobs and upserts them with one multi-row statement per flush, and
+# "copy" streams them through a COPY staging table (best for full re-crawls).
+POSTGRES_PIPELINE_MODE = "batch"
+POSTGRES_BATCH_SIZE = 500
+POSTGRES_FLUSH_INTERVAL = 5.0
+# Bytes of CSV kept in memory by the "copy" mode before spilling to disk
+POSTGRES_COPY_SPOOL_SIZE = 8 * 1024 * 1024
+# Maximum number of company name -> id entries kept in the pipeline's LRU
+POSTGRES_COMPANY_CACHE_SIZE = 10000
+# Preload the content fingerprints of active jobs and only bump last_seen_at
+# for items whose title/location/etc. did not change since the last crawl
+POSTGRES_SKIP_UNCHANGED = True
+
+# jobcrawler.scheduler: refresh interval for sources without one, the share
+# of new/changed jobs per crawl it tunes each source's interval towards,
+# sources crawled per cycle, and how often it checks for due sources.
+SCHEDULER_DEFAULT_INTERVAL = 3600
+SCHEDULER_TARGET_CHURN = 0.2
+SCHEDULER_CAPACITY = 4
+SCHEDULER_POLL_SECONDS = 60
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 #AUTOTHROTTLE_ENABLED = True
@@ -0,0 +1,245 @@
+"""Declarative registry of the job boards crawled by ``CompanySpider``.
+
+Each entry of ``SOURCES`` describes one source:
+
+* ``name``, ``career_page_url``, ``url`` — identity and first page.
+* ``format`` — ``"json"`` (default) or ``"html"``.
+* ``parser`` — spider method handling the responses.  JSON sources leave it
+  out and are parsed by ``parse_json_source`` from their ``items_key`` and
+  ``fields`` instead.
+* ``items_key`` — top-level key of the array holding the jobs.
+* ``fields`` — ``JobItem`` field name to field spec (see below).
+  ``title``, ``job_url`` and ``company_name`` are required; jobs where any
+  of them is empty are skipped.
+* ``pagination``, ``max_pages`` — see ``CompanySpider``.
+* ``throttle`` — politeness bounds, see ``AdaptiveThrottle``.
+* ``refresh_interval`` — seconds between crawls the scheduler aims for
+  when the source changes at its usual rate (see ``jobcrawler.scheduler``).
+* ``extends`` — name of an earlier entry whose keys this one inherits.
+
+A field spec is one of:
+
+* ``"a.b"`` — dotted path into the job object.
+* ``{"path": "a.b", "transform": ..., "template": ..., "default": ...}`` —
+  a path whose non-empty value is passed through a ``TRANSFORMS`` entry and
+  then ``template.format(value)``; empty values become ``default``.
+* ``[spec, spec, ...]`` — the first spec giving a non-empty value.
+
+``compile_extractor`` turns ``fields`` into a single function once, at
+import time, so the per-job loop only calls prebuilt accessors.
+"""
+
+# Applied to a field's raw value before ``template``.
+TRANSFORMS = {
+    "str": str,
+    "join": lambda value: (
+        ", ".join(str(part) for part in value) if isinstance(value, list) else str(value)
+    ),
+}
+
+REQUIRED_FIELDS = ("title", "job_url", "company_name")
+OPTIONAL_FIELDS = ("location", "employment_type", "external_id")
+
+SOURCES = [
+    {
+        "name": "Remotive",
+        "career_page_url": "https://remotive.com",
+        # Without ``limit`` the API returns its whole feed in one response.
+        "url": "https://remotive.com/api/remote-jobs",
+        "items_key": "jobs",
+        "fields": {
+            "title": "title",
+            "company_name": "company_name",
+            "job_url": "url",
+            "location": "candidate_required_location",
+            "employment_type": "job_type",
+            "external_id": {"path": "id", "template": "remotive-{}"},
+        },
+        # Remotive asks clients to keep request volume low.
+        "throttle": {"min_delay": 2.0, "max_concurrency": 1},
+        # One large feed that turns over slowly.
+        "refresh_interval": 6 * 3600,
+    },
+    {
+        "name": "Arbeitnow",
+        "career_page_url": "https://www.arbeitnow.com",
+        "url": "https://www.arbeitnow.com/api/job-board-api",
+        "items_key": "data",
+        "fields": {
+            "title": "title",
+            "company_name": "company_name",
+            "job_url": "url",
+            "location": "location",
+            "employment_type": {"path": "job_types", "transform": "join"},
+            "external_id": {"path": "slug", "template": "arbeitnow-{}"},
+        },
+        "pagination": {"type": "next_link"},
+        "max_pages": 10,
+        "throttle": {"min_delay": 0.5, "max_concurrency": 2},
+        "refresh_interval": 3600,
+    },
+    {
+        "name": "Himalayas",
+        "career_page_url": "https://himalayas.app",
+        "url": "https://himalayas.app/jobs/api?limit=50",
+        "items_key": "jobs",
+        "fields": {
+            "title": "title",
+            "company_name": "companyName",
+            "job_url": [
+                "applicationLink",
+                {"path": "guid", "template": "https://himalayas.app/jobs/{}"},
+            ],
+            "location": {"path": "locationRestrictions", "transform": "join"},
+            "employment_type": "employmentType",
+            "external_id": {"path": "guid", "template": "himalayas-{}"},
+        },
+        "pagination": {
+            "type": "offset",
+            "param": "offset",
+            "limit": 50,
+            "total_key": "totalCount",
+        },
+        "max_pages": 20,
+        "throttle": {"min_delay": 0.5, "max_concurrency": 3},
+        "refresh_interval": 2 * 3600,
+    },
+    {
+        "name": "Remotive (PH Remote)",
+        "extends": "Remotive",
+        "url": "https://remotive.com/api/remote-jobs?location=philippines",
+    },
+    {
+        "name": "Himalayas (PH)",
+        "extends": "Himalayas",
+        "url": "https://himalayas.app/jobs/api?limit=50&location=Philippines",
+        "max_pages": 5,
+    },
+    {
+        "name": "Kalibrr",
+        "career_page_url": "https://www.kalibrr.com/job-board/te/software-engineer/1",
+        "url": "https://www.kalibrr.com/job-board/te/software-engineer/1",
+        "parser": "parse_kalibrr",  # HTML scraper
+        "format": "html",
+        "pagination": {
+            "type": "path_page",
+            "template": "https://www.kalibrr.com/job-board/te/software-engineer/{page}",
+        },
+        "max_pages": 5,
+        "throttle": {"min_delay": 2.0, "max_delay": 120.0, "max_concurrency": 1},
+        "refresh_interval": 6 * 3600,
+    },
+]
+
+
+def _compile_path(path):
+    keys = tuple(path.split("."))
+    if len(keys) == 1:
+        key = keys[0]
+
+        def get(job):
+            return job.get(key)
+
+        return get
+
+    def get_nested(job):
+        value = job
+        for key in keys:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    return get_nested
+
+
+def _compile_field(spec):
+    if isinstance(spec, str):
+        return _compile_path(spec)
+
+    if isinstance(spec, list):
+        getters = tuple(_compile_field(part) for part in spec)
+
+        def first(job):
+            for get in getters:
+                value = get(job)
+                if value:
+                    return value
+            return None
+
+        return first
+
+    get = _compile_path(spec["path"])
+    transform_name = spec.get("transform")
+    if transform_name is not None and transform_name not in TRANSFORMS:
+        raise ValueError(f"Unknown field transform {transform_name!r}")
+    transform = TRANSFORMS.get(transform_name)
+    template = spec.get("template")
+    default = spec.get("default")
+
+    def field(job):
+        value = get(job)
+        if value is None or value == "" or value == []:
+            return default
+        if transform is not None:
+            value = transform(value)
+        if template is not None:
+            value = template.format(value)
+        return value
+
+    return field
+
+
+def compile_extractor(fields):
+    """Compile a ``fields`` mapping into ``extract(job) -> dict | None``."""
+    missing = [name for name in REQUIRED_FIELDS if name not in fields]
+    if missing:
+        raise ValueError(f"Source fields are missing {missing}")
+    unknown = set(fields) - set(REQUIRED_FIELDS) - set(OPTIONAL_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown source fields {sorted(unknown)}")
+
+    required = tuple((name, _compile_field(fields[name])) for name in REQUIRED_FIELDS)
+    optional = tuple(
+        (name, _compile_field(fields[name])) for name in OPTIONAL_FIELDS if name in fields
+    )
+
+    def extract(job):
+        if not isinstance(job, dict):
+            return None
+        values = {}
+        for name, get in required:
+            value = get(job)
+            if not value:
+                return None
+            values[name] = value
+        for name, get in optional:
+            values[name] = get(job)
+        return values
+
+    return extract
+
+
+def _resolve(sources):
+    by_name = {}
+    resolved = []
+    for source in sources:
+        if "extends" in source:
+            base = by_name[source["extends"]]
+            source = {
+                **{key: value for key, value in base.items() if key != "name"},
+                **{key: value for key, value in source.items() if key != "extends"},
+            }
+        by_name[source["name"]] = source
+        resolved.append(source)
+    return resolved
+
+
+SOURCES = _resolve(SOURCES)
+
+# Compiled once at import; keyed by source name.
+EXTRACTORS = {
+    source["name"]: compile_extractor(source["fields"])
+    for source in SOURCES
+    if "fields" in source
+}
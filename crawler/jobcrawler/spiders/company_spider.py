@@ -1,17 +1,55 @@
-import json
-import re
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import scrapy
+from scrapy.exceptions import IgnoreRequest
+from scrapy.spidermiddlewares.httperror import HttpError
+from jobcrawler import htmlextract, jsonstream
 from jobcrawler.items import JobItem
+from jobcrawler.sources import EXTRACTORS, SOURCES
 
 
 class CompanySpider(scrapy.Spider):
     """Aggregate tech job listings from multiple public job board APIs.
 
-    Each source has a dedicated parse method because every API returns a
-    different JSON schema.  Using public JSON APIs is deliberate — most
-    modern career pages are JavaScript SPAs whose content is invisible to a
-    plain HTTP fetcher.  Public APIs give us structured, reliable data.
+    Sources are declared in ``jobcrawler.sources``.  JSON APIs share
+    ``parse_json_source``, driven by the field mapping compiled for each
+    source; HTML pages name a dedicated parse method.  Using public JSON
+    APIs is deliberate — most modern career pages are JavaScript SPAs whose
+    content is invisible to a plain HTTP fetcher.  Public APIs give us
+    structured, reliable data.
+
+    The spider tracks which sources it requested, which of their requests
+    are still outstanding, how many items each produced and which failed.
+    A request only counts as answered once its callback has run to the end;
+    a callback that raises leaves it outstanding, and
+    ``JobcrawlerSpiderMiddleware`` marks the source failed.
+    ``PostgresPipeline`` only deactivates stale jobs for the sources in
+    ``completed_sources()``.
+
+    Sources with a ``pagination`` entry are followed past their first page,
+    up to ``max_pages`` (default ``SOURCE_MAX_PAGES``) pages per source:
+
+    * ``next_link`` — follow the URL in the JSON body's ``links.next``.
+    * ``offset`` — step the ``param`` query parameter by ``limit``.  Once
+      the first page reports ``total_key``, the remaining pages are all
+      scheduled at once.
+    * ``path_page`` — format ``template`` with the next page number.
+
+    Pagination stops early on a page without jobs.  A source whose listing
+    goes on past ``max_pages`` is recorded in ``truncated_sources`` and kept
+    out of the stale-job sweep, since its unfetched pages were not re-seen.
+    For ``path_page`` sources that is decided from the last page's markup
+    (``htmlextract.next_page_hint``) or, when the markup does not tell, by
+    probing page ``max_pages + 1``: it only truncates the source if it has
+    jobs.
+    Every source starts in
+    parallel and Scrapy keeps one download slot per domain, so the
+    per-domain ``CONCURRENT_REQUESTS_PER_DOMAIN``/``DOWNLOAD_DELAY`` limits
+    still hold while different domains are crawled at the same time.
+
+    Those limits are only the starting point: ``AdaptiveThrottle`` retunes
+    each domain within the bounds of its source's ``throttle`` entry.
     """
 
     name = "company_spider"
@@ -27,51 +65,45 @@ class CompanySpider(scrapy.Spider):
         "ROBOTSTXT_OBEY": False,  # JSON APIs don't serve robots.txt
     }
 
-    SOURCES = [
-        {
-            "name": "Remotive",
-            "career_page_url": "https://remotive.com",
-            "url": "https://remotive.com/api/remote-jobs?limit=100",
-            "parser": "parse_remotive",
-        },
-        {
-            "name": "Arbeitnow",
-            "career_page_url": "https://www.arbeitnow.com",
-            "url": "https://www.arbeitnow.com/api/job-board-api",
-            "parser": "parse_arbeitnow",
-        },
-        {
-            "name": "Himalayas",
-            "career_page_url": "https://himalayas.app",
-            "url": "https://himalayas.app/jobs/api?limit=50",
-            "parser": "parse_himalayas",
-        },
-        {
-            "name": "Remotive (PH Remote)",
-            "career_page_url": "https://remotive.com",
-            "url": "https://remotive.com/api/remote-jobs?limit=100&location=philippines",
-            "parser": "parse_remotive",
-        },
-        {
-            "name": "Himalayas (PH)",
-            "career_page_url": "https://himalayas.app",
-            "url": "https://himalayas.app/jobs/api?limit=50&location=Philippines",
-            "parser": "parse_himalayas",
-        },
-        {
-            "name": "Kalibrr",
-            "career_page_url": "https://www.kalibrr.com/job-board/te/software-engineer/1",
-            "url": "https://www.kalibrr.com/job-board/te/software-engineer/1",
-            "parser": "parse_kalibrr",  # HTML scraper
-            "format": "html",
-        },
-    ]
+    SOURCES = SOURCES
+
+    def __init__(self, *args, sources=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ``-a sources=Name,Other`` restricts the crawl to those SOURCES.
+        self.source_names = set(sources.split(",")) if sources else None
+        self.requested_sources = set()
+        self.failed_sources = set()
+        self.unchanged_sources = set()
+        self.truncated_sources = set()
+        self._pending_requests = Counter()
+        self._items = Counter()
+        self._sources = {}
+
+    def completed_sources(self):
+        """Sources whose every request was answered and parsed without error.
+
+        Sources skipped because their response had not changed are left out:
+        their jobs were never re-seen, so they must not be swept as stale.
+        So are sources that produced no items at all — an empty listing is
+        far more often a bot-block page or an outage than a board with no
+        openings — and sources whose pagination hit ``max_pages``.
+        """
+        return {
+            name
+            for name in self.requested_sources
+            if name not in self.failed_sources
+            and name not in self.unchanged_sources
+            and name not in self.truncated_sources
+            and self._pending_requests[name] <= 0
+            and self._items[name] > 0
+        }
 
     async def start(self):
         for source in self.SOURCES:
-            parser_name = source.get("parser", "")
-            callback = getattr(self, parser_name, None)
-            if callback is None:
+            if self.source_names is not None and source["name"] not in self.source_names:
+                continue
+            parser_name = source.get("parser", "parse_json_source")
+            if getattr(self, parser_name, None) is None:
                 self.logger.error(
                     "Skipping source '%s': parser '%s' is not defined.",
                     source.get("name", "unknown"),
@@ -79,31 +111,137 @@ class CompanySpider(scrapy.Spider):
                 )
                 continue
 
-            headers = {"Accept": "application/json"}
-            if source.get("format") == "html":
-                headers = {"Accept": "text/html,application/xhtml+xml"}
-
-            yield scrapy.Request(
-                url=source["url"],
-                callback=callback,
-                meta={
-                    "source_name": source["name"],
-                    "career_page_url": source["career_page_url"],
-                },
-                errback=self.handle_error,
-                headers=headers,
-            )
+            self._sources[source["name"]] = source
+            self.requested_sources.add(source["name"])
+            yield self._page_request(source, source["url"], page=1)
+
+    def _page_request(self, source, url, page, sharded=False):
+        headers = {"Accept": "application/json"}
+        if source.get("format") == "html":
+            headers = {"Accept": "text/html,application/xhtml+xml"}
+
+        self._pending_requests[source["name"]] += 1
+        return scrapy.Request(
+            url=url,
+            callback=self._parse_page,
+            meta={
+                "source_name": source["name"],
+                "career_page_url": source["career_page_url"],
+                "page": page,
+                "sharded": sharded,
+                # Only the first page decides whether a source is unchanged;
+                # later pages are always fetched so the chain is not cut.
+                "conditional": page == 1,
+            },
+            errback=self.handle_error,
+            headers=headers,
+        )
+
+    def _next_pages(self, response, found, data=None):
+        """Yield the follow-up page requests for the source of ``response``."""
+        source = self._sources[response.meta["source_name"]]
+        pagination = source.get("pagination")
+        page = response.meta.get("page", 1)
+        max_pages = source.get("max_pages", self.settings.getint("SOURCE_MAX_PAGES", 10))
+        if not pagination or not found:
+            return
+
+        kind = pagination["type"]
+        if kind == "next_link":
+            next_url = ((data or {}).get("links") or {}).get("next")
+            if next_url and page >= max_pages:
+                self._truncated(source, max_pages)
+            elif next_url:
+                yield self._page_request(source, response.urljoin(next_url), page + 1)
+        elif kind == "offset":
+            if response.meta.get("sharded"):
+                return
+            limit = pagination["limit"]
+            total = (data or {}).get(pagination.get("total_key", ""))
+            if isinstance(total, int):
+                needed = -(-total // limit)
+                if needed > max_pages:
+                    self._truncated(source, max_pages)
+                pages, sharded = range(page + 1, min(max_pages, needed) + 1), True
+            elif page >= max_pages:
+                self._truncated(source, max_pages)
+                return
+            else:
+                pages, sharded = [page + 1], False
+            for number in pages:
+                url = _with_query(source["url"], **{pagination["param"]: (number - 1) * limit})
+                yield self._page_request(source, url, number, sharded=sharded)
+        elif kind == "path_page":
+            next_url = pagination["template"].format(page=page + 1)
+            if response.meta.get("probe"):
+                # The page past max_pages has jobs.
+                self._truncated(source, max_pages)
+            elif page < max_pages:
+                yield self._page_request(source, next_url, page + 1)
+            else:
+                more = htmlextract.next_page_hint(response, next_url, page)
+                if more:
+                    self._truncated(source, max_pages)
+                elif more is None:
+                    request = self._page_request(source, next_url, page + 1)
+                    request.meta["probe"] = True
+                    yield request
+        else:
+            self.logger.error("%s: unknown pagination type %r", source["name"], kind)
+
+    def _truncated(self, source, max_pages):
+        if source["name"] in self.truncated_sources:
+            return
+        self.truncated_sources.add(source["name"])
+        self.crawler.stats.set_value(f"source/{source['name']}/truncated", 1)
+        self.logger.warning(
+            "%s: more than %d pages listed; not sweeping its stale jobs",
+            source["name"],
+            max_pages,
+        )
 
     def handle_error(self, failure):
+        source = failure.request.meta.get("source_name", "unknown")
+        self._pending_requests[source] -= 1
+        if failure.check(IgnoreRequest) and failure.request.meta.get("source_unchanged"):
+            self.unchanged_sources.add(source)
+            self.logger.info("Skipping %s: %s is unchanged", source, failure.request.url)
+            return
+        if failure.request.meta.get("probe"):
+            # A missing page past max_pages means the listing ended there;
+            # any other failure leaves it unknown, so the source is not swept.
+            if not (failure.check(HttpError) and failure.value.response.status in (404, 410)):
+                self.truncated_sources.add(source)
+            return
+        self.failed_sources.add(source)
+        self.crawler.stats.inc_value(f"source/{source}/failures/{failure.type.__name__}")
         self.logger.warning(
-            "Request failed for %s: %s",
-            failure.request.meta.get("source_name", "unknown"),
+            "Request failed for %s: %s (%s)",
+            source,
             failure.request.url,
+            failure.type.__name__,
         )
 
+    def _parse_page(self, response):
+        """Run the source's parser; the request is answered once it finishes."""
+        source = response.meta["source_name"]
+        parse = getattr(self, self._sources[source].get("parser", "parse_json_source"))
+        for output in parse(response):
+            if isinstance(output, JobItem):
+                self._items[source] += 1
+            yield output
+        self._pending_requests[source] -= 1
+
     # ── helpers ─────────────────────────────────────────────────────────
+    def _source_meta(self, response):
+        """Return ``(source_name, career_page_url)`` and count the page."""
+        source = response.meta["source_name"]
+        self.crawler.stats.inc_value(f"source/{source}/pages")
+        return source, response.meta["career_page_url"]
+
     def _make_item(self, title, job_url, company_name, career_page_url,
-                   location=None, employment_type=None, external_id=None):
+                   location=None, employment_type=None, external_id=None,
+                   source=None):
         item = JobItem()
         item["title"] = title.strip()
         item["job_url"] = job_url
@@ -112,163 +250,105 @@ class CompanySpider(scrapy.Spider):
         item["location"] = (location or "Remote").strip()
         item["employment_type"] = (employment_type or "").strip() or None
         item["external_id"] = external_id or job_url
+        item["source"] = source
         return item
 
-    def _parse_json(self, response, source_name):
+    def _json_payload(self, response, source_name, items_key):
+        """Return ``(jobs, data)`` for a JSON response, or ``(None, None)``.
+
+        Bodies up to ``JSON_STREAMING_THRESHOLD`` bytes are decoded in one
+        go and ``data`` is the whole document.  Larger bodies are streamed:
+        ``jobs`` is an iterator over the ``items_key`` array and ``data``
+        only holds the fields the source's pagination reads.
+        """
+        threshold = self.settings.getint("JSON_STREAMING_THRESHOLD", 1024 * 1024)
+        if len(response.body) <= threshold or not jsonstream.can_stream():
+            try:
+                data = jsonstream.loads(response.body)
+            except jsonstream.DECODE_ERRORS:
+                self._json_failed(response, source_name)
+                return None, None
+            return data.get(items_key, []), data
+
+        self.crawler.stats.inc_value("source/streamed_json_bodies")
+        paths = self._pagination_paths(self._sources[source_name])
         try:
-            return json.loads(response.text)
-        except json.JSONDecodeError:
-            self.logger.error(
-                "%s: could not decode JSON from %s", source_name, response.url
-            )
-            return None
-
-    def _looks_like_job_title(self, title):
-        text = (title or "").strip().lower()
-        if len(text) < 5:
-            return False
-        noise = {
-            "careers",
-            "jobs",
-            "job board",
-            "view all jobs",
-            "learn more",
-            "read more",
-            "apply",
-            "apply now",
-            "see more",
-            "next",
-            "previous",
-        }
-        if text in noise:
-            return False
-        return True
-
-    # ── Remotive ────────────────────────────────────────────────────────
-    def parse_remotive(self, response):
-        source = response.meta["source_name"]
-        career_page = response.meta["career_page_url"]
-
-        data = self._parse_json(response, source)
-        if data is None:
-            return
-
-        for job in data.get("jobs", []):
-            title = job.get("title", "")
-            company = job.get("company_name", "")
-            if not title or not company:
-                continue
-
-            job_url = job.get("url", "")
-            if not job_url:
-                continue
-
-            location = job.get("candidate_required_location", "Remote")
-            emp_type = job.get("job_type", "")
-            ext_id = str(job.get("id", ""))
-
-            yield self._make_item(
-                title=title,
-                job_url=job_url,
-                company_name=company,
-                career_page_url=career_page,
-                location=location,
-                employment_type=emp_type,
-                external_id=f"remotive-{ext_id}" if ext_id else None,
-            )
+            data = jsonstream.select(response.body, paths) if paths else {}
+        except jsonstream.DECODE_ERRORS:
+            self._json_failed(response, source_name)
+            return None, None
+        return self._stream_jobs(response, source_name, items_key), data
 
-    # ── Arbeitnow ──────────────────────────────────────────────────────
-    def parse_arbeitnow(self, response):
-        source = response.meta["source_name"]
-        career_page = response.meta["career_page_url"]
+    def _stream_jobs(self, response, source_name, items_key):
+        try:
+            yield from jsonstream.iter_items(response.body, items_key)
+        except jsonstream.DECODE_ERRORS:
+            self._json_failed(response, source_name)
+
+    def _json_failed(self, response, source_name):
+        self.failed_sources.add(source_name)
+        self.logger.error(
+            "%s: could not decode JSON from %s", source_name, response.url
+        )
 
-        data = self._parse_json(response, source)
-        if data is None:
+    @staticmethod
+    def _pagination_paths(source):
+        pagination = source.get("pagination") or {}
+        if pagination.get("type") == "next_link":
+            return ["links.next"]
+        if pagination.get("type") == "offset" and pagination.get("total_key"):
+            return [pagination["total_key"]]
+        return []
+
+    # ── JSON sources ───────────────────────────────────────────────────
+    def parse_json_source(self, response):
+        source, career_page = self._source_meta(response)
+        spec = self._sources[source]
+
+        jobs, data = self._json_payload(response, source, spec["items_key"])
+        if jobs is None:
             return
 
-        for job in data.get("data", []):
-            title = job.get("title", "")
-            company = job.get("company_name", "")
-            if not title or not company:
-                continue
-
-            job_url = job.get("url", "")
-            if not job_url:
+        extract = EXTRACTORS[source]
+        found = 0
+        for job in jobs:
+            fields = extract(job)
+            if fields is None:
                 continue
+            found += 1
+            yield self._make_item(career_page_url=career_page, source=source, **fields)
 
-            location = job.get("location", "Remote")
-            job_types = job.get("job_types", [])
-            emp_type = ", ".join(job_types) if isinstance(job_types, list) else str(job_types)
-            slug = job.get("slug", "")
+        yield from self._next_pages(response, found, data)
 
-            yield self._make_item(
-                title=title,
-                job_url=job_url,
-                company_name=company,
-                career_page_url=career_page,
-                location=location,
-                employment_type=emp_type,
-                external_id=f"arbeitnow-{slug}" if slug else None,
-            )
-
-    # ── Himalayas ──────────────────────────────────────────────────────
-    def parse_himalayas(self, response):
-        source = response.meta["source_name"]
-        career_page = response.meta["career_page_url"]
-
-        data = self._parse_json(response, source)
-        if data is None:
+    # ── Kalibrr ────────────────────────────────────────────────────────
+    def parse_kalibrr(self, response):
+        source, career_page = self._source_meta(response)
+        found = 0
+
+        structured = htmlextract.structured_jobs(response)
+        if structured:
+            self.crawler.stats.inc_value(f"source/{source}/structured_pages")
+            for fields in structured:
+                found += 1
+                yield self._make_item(
+                    career_page_url=career_page,
+                    source=source,
+                    **{**fields, "location": fields["location"] or "Philippines"},
+                )
+            yield from self._next_pages(response, found)
             return
 
-        for job in data.get("jobs", []):
-            title = job.get("title", "")
-            company = job.get("companyName", "")
-            if not title or not company:
-                continue
-
-            job_url = job.get("applicationLink", "")
-            if not job_url:
-                guid = job.get("guid", "")
-                job_url = f"https://himalayas.app/jobs/{guid}" if guid else ""
-            if not job_url:
-                continue
-
-            restrictions = job.get("locationRestrictions") or []
-            location = ", ".join(restrictions) if restrictions else "Remote"
-            emp_type = job.get("employmentType", "")
-            guid = job.get("guid", "")
-
-            yield self._make_item(
-                title=title,
-                job_url=job_url,
-                company_name=company,
-                career_page_url=career_page,
-                location=location,
-                employment_type=emp_type,
-                external_id=f"himalayas-{guid}" if guid else None,
-            )
-
-    def parse_kalibrr(self, response):
-        career_page = response.meta["career_page_url"]
-        links = response.css("a[href*='/job/'], a[href*='job-board'], a[href*='jobs']") or response.css("a[href]")
         seen = set()
-        for link in links:
-            href = (link.attrib.get("href") or "").strip()
-            if not href or href.startswith("#"):
-                continue
-
+        for href, title in htmlextract.link_candidates(response):
             job_url = response.urljoin(href)
             if job_url in seen:
                 continue
             seen.add(job_url)
 
-            title = " ".join(
-                t.strip() for t in link.css("::text").getall() if t.strip()
-            )
-            title = re.sub(r"\s+", " ", title).strip()
-            if not self._looks_like_job_title(title):
+            if not htmlextract.looks_like_job_title(title):
                 continue
 
+            found += 1
             yield self._make_item(
                 title=title,
                 job_url=job_url,
@@ -277,4 +357,15 @@ class CompanySpider(scrapy.Spider):
                 location="Philippines",
                 employment_type=None,
                 external_id=f"kalibrr-{job_url}",
+                source=source,
             )
+
+        yield from self._next_pages(response, found)
+
+
+def _with_query(url, **params):
+    """Return ``url`` with ``params`` set in its query string."""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update({key: str(value) for key, value in params.items()})
+    return urlunsplit(parts._replace(query=urlencode(query)))